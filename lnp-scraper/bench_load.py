@@ -0,0 +1,183 @@
+"""
+Load scenarios against lnp_service.py; reports req/s and p50/p95/p99 per scenario.
+
+Fully offline with --spawn: starts bench_mock_api.py and the service (static
+token source, store disabled) on local ports, runs the scenarios, stops both.
+
+    python bench_load.py --spawn --duration 15 --concurrency 32
+    python bench_load.py --service http://127.0.0.1:8765 --scenario players
+
+Extra env for the spawned processes (e.g. MOCK_LATENCY_MS, MOCK_5XX_RATE,
+CACHE_TTL_SHORT_MS=0 to bench without the response cache) is passed through.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCENARIOS = ("teams", "players", "stats-batch")
+
+
+def percentile(sorted_vals: List[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    i = min(len(sorted_vals) - 1, max(0, int(round(q * (len(sorted_vals) - 1)))))
+    return sorted_vals[i]
+
+
+async def discover(c: httpx.AsyncClient) -> Dict[str, Any]:
+    """Walk seasons -> leagues -> plays -> teams -> squad once to get real ids."""
+    seasons = (await c.get("/seasons")).raise_for_status().json()
+    season = next((s for s in seasons if s.get("isCurrent")), seasons[0])
+    leagues = (await c.get("/leagues", params={"seasonId": season["id"]})).raise_for_status().json()
+    league = leagues[0]
+    plays = (
+        await c.get("/plays", params={"seasonId": season["id"], "leagueId": league["league_id"]})
+    ).raise_for_status().json()
+    play = plays[0]
+    teams = (
+        await c.get(
+            "/teams", params={"seasonId": season["id"], "leagueId": league["league_id"], "playId": play["id"]}
+        )
+    ).raise_for_status().json()
+    squad = (await c.get("/players", params={"teamId": teams[0]["team_id"]})).raise_for_status().json()
+    return {
+        "seasonId": season["id"],
+        "leagueId": league["league_id"],
+        "playId": play["id"],
+        "teamIds": [t["team_id"] for t in teams],
+        "playerIds": [p["player_id"] for p in squad if p.get("player_id")],
+    }
+
+
+async def run_scenario(c: httpx.AsyncClient, name: str, ids: Dict[str, Any], duration: float, concurrency: int):
+    latencies: List[float] = []
+    errors = 0
+    n = 0
+    deadline = time.perf_counter() + duration
+
+    async def request(i: int) -> httpx.Response:
+        if name == "teams":
+            return await c.get(
+                "/teams", params={"seasonId": ids["seasonId"], "leagueId": ids["leagueId"], "playId": ids["playId"]}
+            )
+        if name == "players":
+            team_ids = ids["teamIds"]
+            return await c.get("/players", params={"teamId": team_ids[i % len(team_ids)]})
+        return await c.post(
+            "/player-stats/batch",
+            json={"seasonId": ids["seasonId"], "leagueId": ids["leagueId"], "players": ids["playerIds"]},
+        )
+
+    async def worker():
+        nonlocal errors, n
+        while time.perf_counter() < deadline:
+            i = n
+            n += 1
+            t0 = time.perf_counter()
+            try:
+                r = await request(i)
+                if r.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "scenario": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50), 1),
+        "p95_ms": round(percentile(latencies, 0.95), 1),
+        "p99_ms": round(percentile(latencies, 0.99), 1),
+    }
+
+
+def spawn(mock_port: int, service_port: int) -> List[subprocess.Popen]:
+    env = dict(os.environ)
+    env.setdefault("LNP_TOKEN_SOURCE", "static")
+    env.setdefault("LNP_STORE_PATH", "")
+    env["LNP_BASE_API"] = f"http://127.0.0.1:{mock_port}/api/bus/competition/v1"
+    uv = [sys.executable, "-m", "uvicorn", "--log-level", "warning"]
+    procs = [
+        subprocess.Popen(uv + ["bench_mock_api:app", "--port", str(mock_port)], cwd=HERE, env=env),
+        subprocess.Popen(uv + ["lnp_service:app", "--port", str(service_port)], cwd=HERE, env=env),
+    ]
+    return procs
+
+
+async def wait_ready(url: str, timeout_s: float = 20.0):
+    deadline = time.perf_counter() + timeout_s
+    async with httpx.AsyncClient() as c:
+        while time.perf_counter() < deadline:
+            try:
+                if (await c.get(url + "/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Service at {url} did not become ready")
+
+
+async def main_async(args) -> List[Dict[str, Any]]:
+    await wait_ready(args.service)
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(base_url=args.service, timeout=60.0, limits=limits) as c:
+        ids = await discover(c)
+        names = SCENARIOS if args.scenario == "all" else (args.scenario,)
+        results = []
+        for name in names:
+            results.append(await run_scenario(c, name, ids, args.duration, args.concurrency))
+        return results
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--service", default="http://127.0.0.1:8765")
+    ap.add_argument("--scenario", choices=SCENARIOS + ("all",), default="all")
+    ap.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--spawn", action="store_true", help="start mock API + service locally")
+    ap.add_argument("--mock-port", type=int, default=8799)
+    ap.add_argument("--json", action="store_true", help="print results as JSON")
+    args = ap.parse_args(argv)
+
+    procs: List[subprocess.Popen] = []
+    if args.spawn:
+        port = int(args.service.rsplit(":", 1)[1]) if args.service.count(":") == 2 else 8765
+        procs = spawn(args.mock_port, port)
+    try:
+        results = asyncio.run(main_async(args))
+    finally:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            p.wait(timeout=10)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'scenario':<12} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for r in results:
+        print(
+            f"{r['scenario']:<12} {r['requests']:>9} {r['errors']:>7} {r['rps']:>8} "
+            f"{r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Local stand-in for competition-api-pro, for benchmarking lnp_service.py offline.
+
+Replays payloads recorded by the service (LNP_RECORD_DIR) and synthesizes
+deterministic ones for everything else. Latency and 401/5xx are injectable.
+
+Run:
+    MOCK_LATENCY_MS=80 MOCK_5XX_RATE=0.01 uvicorn bench_mock_api:app --port 8799
+
+and point the service at it:
+    LNP_BASE_API=http://127.0.0.1:8799/api/bus/competition/v1 LNP_TOKEN_SOURCE=static \\
+        uvicorn lnp_service:app --port 8765
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import uuid
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+from lnp_service import is_uuid, path_template, record_path
+
+PREFIX = "/api/bus/competition/v1"
+
+MOCK_LATENCY_MS = float(os.getenv("MOCK_LATENCY_MS", "50"))
+MOCK_JITTER_MS = float(os.getenv("MOCK_JITTER_MS", "20"))
+MOCK_401_RATE = float(os.getenv("MOCK_401_RATE", "0"))
+MOCK_5XX_RATE = float(os.getenv("MOCK_5XX_RATE", "0"))
+MOCK_PAYLOAD_DIR = os.getenv("MOCK_PAYLOAD_DIR", "").strip()
+MOCK_LEAGUES = int(os.getenv("MOCK_LEAGUES", "4"))
+MOCK_TEAMS = int(os.getenv("MOCK_TEAMS", "16"))
+MOCK_SQUAD = int(os.getenv("MOCK_SQUAD", "25"))
+
+NS = uuid.UUID("6b1f3c1e-58a4-4a55-9d59-2f7b3c0e8a10")
+
+FIRST = ["Jan", "Piotr", "Kacper", "Michał", "Jakub", "Szymon", "Łukasz", "Mateusz", "Paweł", "Wojciech"]
+LAST = ["Nowak", "Kowalski", "Wiśniewski", "Wójcik", "Kamiński", "Lewandowski", "Zieliński", "Szymański"]
+POSITIONS = ["GK", "DF", "MF", "FW"]
+
+app = FastAPI(title="LNP mock competition-api")
+
+counters: Dict[str, int] = {"requests": 0, "injected_401": 0, "injected_5xx": 0, "replayed": 0}
+
+
+def uid(*parts: Any) -> str:
+    return str(uuid.uuid5(NS, "/".join(str(p) for p in parts)))
+
+
+def _recorded(path: str) -> Optional[bytes]:
+    if not MOCK_PAYLOAD_DIR:
+        return None
+    for candidate in (path, path_template(path)):
+        fp = record_path(MOCK_PAYLOAD_DIR, candidate)
+        if os.path.exists(fp):
+            with open(fp, "rb") as f:
+                return f.read()
+    return None
+
+
+def _synth(path: str) -> Any:
+    parts = [p for p in path.split("?", 1)[0].split("/") if p]
+    season = uid("season", "current")
+
+    if parts == ["seasons", "dictionaries"]:
+        return [{"id": season, "name": "2025/2026", "isCurrent": True}, {"id": uid("season", "prev"), "name": "2024/2025"}]
+
+    if len(parts) == 6 and parts[0] == "leagues" and parts[-1] == "league-groups":
+        sid = parts[2]
+        return {
+            "items": [
+                {
+                    "name": "Grupa mock",
+                    "leagues": [{"id": uid("league", sid, i), "name": f"Liga {i + 1}"} for i in range(MOCK_LEAGUES)],
+                }
+            ]
+        }
+
+    if len(parts) == 5 and parts[0] == "leagues" and parts[-1] == "play-dictionaries":
+        lid, sid = parts[1], parts[3]
+        return [{"id": uid("play", lid, sid), "name": "Runda jesienna"}]
+
+    if len(parts) == 3 and parts[0] == "plays" and parts[2] == "tables":
+        pid = parts[1]
+        return {
+            "rows": [
+                {"teamId": uid("team", pid, i), "teamName": f"Klub {i + 1}", "points": 3 * (MOCK_TEAMS - i)}
+                for i in range(MOCK_TEAMS)
+            ]
+        }
+
+    if len(parts) == 3 and parts[0] == "plays" and parts[2] == "queues":
+        return []
+
+    if len(parts) == 3 and parts[0] == "teams" and parts[2] == "players":
+        tid = parts[1]
+        rnd = random.Random(tid)
+        return [
+            {
+                "id": uid("player", tid, i),
+                "firstName": rnd.choice(FIRST),
+                "lastName": rnd.choice(LAST),
+                "number": i + 1,
+                "position": rnd.choice(POSITIONS),
+                "clubName": f"Klub {tid[:4]}",
+            }
+            for i in range(MOCK_SQUAD)
+        ]
+
+    if len(parts) == 7 and parts[0] == "players" and parts[-1] == "stats" and is_uuid(parts[1]):
+        rnd = random.Random(path)
+        games = rnd.randint(0, 30)
+        return {
+            "matches": games,
+            "minutes": games * rnd.randint(20, 90),
+            "goals": rnd.randint(0, 15),
+            "assists": rnd.randint(0, 10),
+            "yellowCards": rnd.randint(0, 8),
+            "redCards": rnd.randint(0, 1),
+        }
+
+    return None
+
+
+@app.get("/_mock/stats")
+async def mock_stats():
+    return counters
+
+
+@app.get(PREFIX + "/{rest:path}")
+async def upstream(rest: str, request: Request):
+    counters["requests"] += 1
+    delay = max(0.0, random.gauss(MOCK_LATENCY_MS, MOCK_JITTER_MS)) / 1000
+    await asyncio.sleep(delay)
+
+    auth = request.headers.get("authorization") or ""
+    if not auth.lower().startswith("bearer ") or random.random() < MOCK_401_RATE:
+        counters["injected_401"] += 1
+        return Response(status_code=401)
+    if random.random() < MOCK_5XX_RATE:
+        counters["injected_5xx"] += 1
+        return Response(status_code=503, content=b"mock 5xx")
+
+    path = "/" + rest + (("?" + request.url.query) if request.url.query else "")
+    raw = _recorded(path)
+    if raw is not None:
+        counters["replayed"] += 1
+        return Response(content=raw, media_type="application/json")
+
+    data = _synth(path)
+    if data is None:
+        return JSONResponse(status_code=404, content={"detail": "mock: unknown path"})
+    return JSONResponse(content=data)
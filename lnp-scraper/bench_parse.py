@@ -0,0 +1,124 @@
+"""
+Micro-benchmarks of the payload parsers in lnp_service.py: extract_teams and the
+normalize_* helpers.
+
+Runs over payloads recorded by the service (LNP_RECORD_DIR) and/or synthetic
+multi-queue tables:
+
+    python bench_parse.py --payloads ./recorded
+    python bench_parse.py --synthetic 12 --rows 18
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import time
+import uuid
+from typing import Any, Callable, List, Tuple
+from urllib.parse import unquote
+
+from lnp_service import (
+    extract_teams,
+    json_loads,
+    normalize_league_groups,
+    normalize_play_dictionaries,
+    normalize_players,
+    normalize_seasons,
+    path_template,
+)
+
+PARSERS: List[Tuple[str, Callable[[Any], Any]]] = [
+    ("/tables", extract_teams),
+    ("/seasons/dictionaries", normalize_seasons),
+    ("/league-groups", normalize_league_groups),
+    ("/play-dictionaries", normalize_play_dictionaries),
+    ("/players", normalize_players),
+]
+
+
+def best_us(fn: Callable[[], Any], number: int, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - t0) / number)
+    return best * 1e6
+
+
+def load_recorded(root: str) -> List[Tuple[str, Any]]:
+    out = []
+    for name in sorted(os.listdir(root)):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(root, name), "rb") as f:
+            out.append((unquote(name[: -len(".json")]), json_loads(f.read())))
+    return out
+
+
+def synthetic_tables(queues: int, rows: int, seed: int = 7) -> Tuple[str, Any]:
+    """A /plays/{id}/tables-like payload: queues x rows, each row with nested team + recent form."""
+    rnd = random.Random(seed)
+
+    def uid() -> str:
+        return str(uuid.UUID(int=rnd.getrandbits(128)))
+
+    return (
+        f"/plays/{uid()}/tables",
+        {
+            "queues": [
+                {
+                    "id": uid(),
+                    "name": f"Kolejka {q + 1}",
+                    "table": {
+                        "rows": [
+                            {
+                                "position": i + 1,
+                                "team": {"id": uid(), "name": f"Klub {i + 1}", "logo": "logo.png"},
+                                "points": rnd.randint(0, 60),
+                                "matches": q + 1,
+                                "goalsFor": rnd.randint(0, 40),
+                                "goalsAgainst": rnd.randint(0, 40),
+                                "form": [
+                                    {"result": rnd.choice("WDL"), "matchId": uid(), "opponent": {"id": uid()}}
+                                    for _ in range(5)
+                                ],
+                            }
+                            for i in range(rows)
+                        ]
+                    },
+                }
+                for q in range(queues)
+            ]
+        },
+    )
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--payloads", default=os.getenv("LNP_RECORD_DIR", ""), help="directory of recorded payloads")
+    ap.add_argument("--synthetic", type=int, default=0, help="also bench a synthetic table with this many queues")
+    ap.add_argument("--rows", type=int, default=18, help="rows per synthetic queue")
+    ap.add_argument("--number", type=int, default=200, help="calls per timing")
+    args = ap.parse_args()
+
+    payloads = load_recorded(args.payloads) if args.payloads else []
+    if args.synthetic:
+        payloads.append(synthetic_tables(args.synthetic, args.rows))
+    if not payloads:
+        raise SystemExit("nothing to bench: pass --payloads DIR and/or --synthetic N")
+
+    print(f"{'payload':<60} {'items':>6} {'us':>11}")
+    for path, payload in payloads:
+        tpl = path_template(path)
+        for suffix, fn in PARSERS:
+            if tpl.split("?")[0].endswith(suffix):
+                n = len(fn(payload))
+                us = best_us(lambda: fn(payload), args.number)
+                print(f"{tpl[:60]:<60} {n:>6} {us:>11.1f}")
+                break
+
+
+if __name__ == "__main__":
+    main()
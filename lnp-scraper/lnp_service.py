@@ -1,18 +1,42 @@
 from __future__ import annotations
 
 import asyncio
+import base64
+import hashlib
+import heapq
+import json
 import os
 import re
+import shutil
+import sqlite3
+import threading
 import time
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+import unicodedata
+import warnings
+from collections import Counter, OrderedDict
+from contextlib import AsyncExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from urllib.parse import quote
 
 import httpx
 from fastapi import FastAPI, HTTPException, Query, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
 from playwright.async_api import async_playwright, BrowserContext, Page
 
+try:
+    import orjson  # optional: much faster (de)serialization
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import numpy as np  # optional: only /league-stats needs it
+except ImportError:  # pragma: no cover
+    np = None
+
 # --- Windows fix: ensure subprocess works (Playwright driver) ---
 if os.name == "nt":
     try:
@@ -21,7 +45,9 @@ if os.name == "nt":
         pass
 
 BASE_SITE = "https://www.laczynaspilka.pl"
-BASE_API = "https://competition-api-pro.laczynaspilka.pl/api/bus/competition/v1"
+BASE_API = os.getenv(
+    "LNP_BASE_API", "https://competition-api-pro.laczynaspilka.pl/api/bus/competition/v1"
+).strip().rstrip("/")
 
 DEBUG = os.getenv("DEBUG", "").strip().lower() in ("1", "true", "yes", "on")
 HEADLESS = os.getenv("HEADLESS", "").strip().lower() not in ("0", "false", "no", "off")
@@ -29,15 +55,123 @@ HEADLESS = os.getenv("HEADLESS", "").strip().lower() not in ("0", "false", "no",
 # Persistent profile (cookies/localStorage) – critical for recaptcha stability
 LNP_USER_DATA_DIR = os.getenv("LNP_USER_DATA_DIR", "./.lnp-profile").strip()
 
+# Last captured tokens (with expiry) survive restarts here, so a restart serves at once ("" disables)
+LNP_TOKEN_CACHE_PATH = os.getenv("LNP_TOKEN_CACHE_PATH", "./.lnp-tokens.json").strip()
+# Playwright storage state (cookies) seeded into a brand-new profile
+LNP_STORAGE_STATE = os.getenv("LNP_STORAGE_STATE", "./lnp_storage_state.json").strip()
+
 # If 1 => you run once headful and can solve challenge manually
 LNP_INTERACTIVE = os.getenv("LNP_INTERACTIVE", "").strip().lower() in ("1", "true", "yes", "on")
 
+# Token source: "playwright" (default), "static" (LNP_STATIC_TOKEN, no browser – benchmarks/mock API)
+# or "broker" (tokens come from `python lnp_service.py broker`; lets uvicorn run with --workers N)
+LNP_TOKEN_SOURCE = os.getenv("LNP_TOKEN_SOURCE", "playwright").strip().lower()
+LNP_STATIC_TOKEN = os.getenv("LNP_STATIC_TOKEN", "static.bench.token").strip()
+# Token broker address: Unix socket path, or host:port (TCP, e.g. on Windows)
+LNP_BROKER_ADDR = os.getenv(
+    "LNP_BROKER_ADDR", "127.0.0.1:8790" if os.name == "nt" else "./.lnp-broker.sock"
+).strip()
+
+# Responses at least this large are gzipped when the client accepts it
+GZIP_MIN_BYTES = int(os.getenv("GZIP_MIN_BYTES", "1024"))
+
+# Cache-Control max-age (s) of normalized endpoints: dictionaries (seasons/leagues/plays), squads + tables
+CLIENT_MAX_AGE_LONG_S = int(os.getenv("CLIENT_MAX_AGE_LONG_S", "300"))
+CLIENT_MAX_AGE_SHORT_S = int(os.getenv("CLIENT_MAX_AGE_SHORT_S", "30"))
+
+# If set, every successful upstream payload is written there (replayed by bench_mock_api.py)
+LNP_RECORD_DIR = os.getenv("LNP_RECORD_DIR", "").strip()
+
 # Stability tuning
 TOKEN_TTL_MS = int(os.getenv("TOKEN_TTL_MS", "15000"))
 CAPTURE_WAIT_MS = int(os.getenv("CAPTURE_WAIT_MS", "12000"))
 CAPTURE_RETRIES = int(os.getenv("CAPTURE_RETRIES", "3"))
 PLAYWRIGHT_RESTART_RETRIES = int(os.getenv("PLAYWRIGHT_RESTART_RETRIES", "2"))
 
+# Background token refresh: renew this long before JWT `exp` (capped at 1/3 of lifetime)
+TOKEN_REFRESH_AHEAD = os.getenv("TOKEN_REFRESH_AHEAD", "1").strip().lower() not in ("0", "false", "no", "off")
+TOKEN_REFRESH_MARGIN_MS = int(os.getenv("TOKEN_REFRESH_MARGIN_MS", "60000"))
+TOKEN_EXPIRY_SKEW_MS = int(os.getenv("TOKEN_EXPIRY_SKEW_MS", "2000"))
+# a sex with no requests for this long is no longer refreshed ahead (until its next request)
+TOKEN_REFRESH_IDLE_MS = int(os.getenv("TOKEN_REFRESH_IDLE_MS", str(10 * 60 * 1000)))
+
+# Token pool: pages per sex capturing tokens independently (1 = single page as before)
+TOKEN_POOL_SIZE = int(os.getenv("TOKEN_POOL_SIZE", "1"))
+TOKEN_POOL_QUARANTINE_MS = int(os.getenv("TOKEN_POOL_QUARANTINE_MS", "60000"))
+
+# Lightweight capture: abort heavy resource types and third-party hosts during refresh navigation
+CAPTURE_LIGHTWEIGHT = os.getenv("CAPTURE_LIGHTWEIGHT", "1").strip().lower() not in ("0", "false", "no", "off")
+CAPTURE_BLOCK_TYPES = {
+    t.strip() for t in os.getenv("CAPTURE_BLOCK_TYPES", "image,media,font,stylesheet").split(",") if t.strip()
+}
+# LNP itself + what the recaptcha flow needs; everything else (analytics, ads, CDNs) is aborted
+CAPTURE_ALLOW_HOSTS = tuple(
+    h.strip().lower()
+    for h in os.getenv("CAPTURE_ALLOW_HOSTS", "laczynaspilka.pl,google.com,gstatic.com,recaptcha.net").split(",")
+    if h.strip()
+)
+
+# Browser lifecycle: the context is recycled once any budget is exceeded (0 disables that budget)
+BROWSER_CHECK_MS = int(os.getenv("BROWSER_CHECK_MS", "60000"))
+BROWSER_MAX_RSS_MB = int(os.getenv("BROWSER_MAX_RSS_MB", "1024"))
+BROWSER_MAX_AGE_MS = int(os.getenv("BROWSER_MAX_AGE_MS", str(6 * 3600 * 1000)))
+BROWSER_MAX_NAVIGATIONS = int(os.getenv("BROWSER_MAX_NAVIGATIONS", "500"))
+# prunable caches (Cache_Data, Code Cache, GPU/shader caches...) in the profile
+BROWSER_MAX_CACHE_MB = int(os.getenv("BROWSER_MAX_CACHE_MB", "256"))
+# tokens expiring sooner than this are renewed on the old browser before a recycle
+BROWSER_SWAP_TOKEN_MS = int(os.getenv("BROWSER_SWAP_TOKEN_MS", "120000"))
+
+# Process-wide upstream limiter: token bucket + AIMD concurrency (see UpstreamLimiter)
+UPSTREAM_RATE_PER_S = float(os.getenv("UPSTREAM_RATE_PER_S", "20"))
+UPSTREAM_MIN_CONCURRENCY = int(os.getenv("UPSTREAM_MIN_CONCURRENCY", "2"))
+UPSTREAM_MAX_CONCURRENCY = int(os.getenv("UPSTREAM_MAX_CONCURRENCY", "25"))
+
+# Circuit breaker per (sex, upstream path template): opens after this many consecutive failures
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))
+# open period before a half-open probe; doubles on each failed probe up to the max
+BREAKER_OPEN_MS = int(os.getenv("BREAKER_OPEN_MS", "15000"))
+BREAKER_MAX_OPEN_MS = int(os.getenv("BREAKER_MAX_OPEN_MS", str(5 * 60 * 1000)))
+# upstream 404s (unknown team/play ids) are answered from memory for this long
+NEGATIVE_TTL_MS = int(os.getenv("NEGATIVE_TTL_MS", "60000"))
+
+# Upstream request priorities (lower goes first)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+# Response cache (per sex + upstream path)
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "2000"))
+CACHE_TTL_LONG_MS = int(os.getenv("CACHE_TTL_LONG_MS", str(6 * 3600 * 1000)))
+CACHE_TTL_SHORT_MS = int(os.getenv("CACHE_TTL_SHORT_MS", str(5 * 60 * 1000)))
+# how long past TTL an entry may still be served while it refreshes in background
+CACHE_STALE_MS = int(os.getenv("CACHE_STALE_MS", str(24 * 3600 * 1000)))
+
+# Persistent store of normalized entities ("" disables)
+LNP_STORE_PATH = os.getenv("LNP_STORE_PATH", "./lnp_store.sqlite3").strip()
+# records older than their upstream path's cache TTL (capped at this) are still served,
+# but refreshed in background
+STORE_REFRESH_MS = int(os.getenv("STORE_REFRESH_MS", str(3600 * 1000)))
+
+# Entity matching: a blocking key shared by more players than this is skipped when a narrower one exists
+MATCH_MAX_BLOCK = int(os.getenv("MATCH_MAX_BLOCK", "500"))
+
+# Teams discovery: plays without any discoverable table are not retried for this long
+TEAMS_NEGATIVE_TTL_MS = int(os.getenv("TEAMS_NEGATIVE_TTL_MS", str(10 * 60 * 1000)))
+
+# Live table subscriptions: one upstream poll per subscribed play per interval, whatever the viewer count
+TABLE_POLL_MS = int(os.getenv("TABLE_POLL_MS", "30000"))
+TABLE_KEEPALIVE_MS = int(os.getenv("TABLE_KEEPALIVE_MS", "15000"))
+TABLE_SUBSCRIBER_QUEUE = int(os.getenv("TABLE_SUBSCRIBER_QUEUE", "32"))
+
+# Bulk export jobs (JSONL + checkpoint per job directory)
+EXPORT_DIR = os.getenv("EXPORT_DIR", "./exports").strip()
+EXPORT_CONCURRENCY = int(os.getenv("EXPORT_CONCURRENCY", "4"))
+EXPORT_RATE_PER_S = float(os.getenv("EXPORT_RATE_PER_S", "5"))
+
+# League aggregation: per-90 rates need at least this many minutes; results kept per (season, league)
+LEAGUE_STATS_MIN_MINUTES = int(os.getenv("LEAGUE_STATS_MIN_MINUTES", "90"))
+LEAGUE_STATS_TTL_MS = int(os.getenv("LEAGUE_STATS_TTL_MS", str(CACHE_TTL_SHORT_MS)))
+LEAGUE_STATS_MAX_ENTRIES = int(os.getenv("LEAGUE_STATS_MAX_ENTRIES", "64"))
+
 UUID_RE = re.compile(
     r"^[0-9a-fA-F]{8}-"
     r"[0-9a-fA-F]{4}-"
@@ -48,7 +182,8 @@ UUID_RE = re.compile(
 
 
 def is_uuid(v: Any) -> bool:
-    return isinstance(v, str) and bool(UUID_RE.match(v))
+    # length first: most strings seen while scanning payloads are names, never 36 chars
+    return isinstance(v, str) and len(v) == 36 and UUID_RE.match(v) is not None
 
 
 def dprint(*args):
@@ -60,43 +195,609 @@ def now_ms() -> int:
     return int(time.time() * 1000)
 
 
+def json_dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def splice_raw(obj: Dict[str, Any], key: str, raw: bytes) -> bytes:
+    """JSON of `obj` plus `key` whose value is already-serialized JSON `raw` (not re-parsed)."""
+    head = json_dumps(obj)[:-1]
+    sep = b"," if len(head) > 1 else b""
+    return head + sep + json_dumps(key) + b":" + (raw or b"null") + b"}"
+
+
+def json_loads(raw: bytes) -> Any:
+    if not raw.strip():
+        return None
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+class Metrics:
+    """
+    Minimal Prometheus text-format registry (counters + histograms); gauges are
+    computed at scrape time in /metrics. Avoids a prometheus_client dependency.
+    """
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0)
+
+    def __init__(self):
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._hist: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], List[float]] = {}
+
+    def describe(self, name: str, kind: str, help_: str):
+        self._help[name] = (kind, help_)
+
+    def inc(self, name: str, labels: Optional[Dict[str, str]] = None, v: float = 1.0):
+        key = (name, tuple(sorted((labels or {}).items())))
+        self._counters[key] = self._counters.get(key, 0.0) + v
+
+    def observe(self, name: str, seconds: float, labels: Optional[Dict[str, str]] = None):
+        key = (name, tuple(sorted((labels or {}).items())))
+        h = self._hist.get(key)
+        if h is None:
+            # per-bucket counts, then sum, then count
+            h = self._hist[key] = [0.0] * (len(self.BUCKETS) + 2)
+        for i, b in enumerate(self.BUCKETS):
+            if seconds <= b:
+                h[i] += 1
+        h[-2] += seconds
+        h[-1] += 1
+
+    @staticmethod
+    def _fmt_labels(labels) -> str:
+        if not labels:
+            return ""
+
+        def esc(v: Any) -> str:
+            return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in labels) + "}"
+
+    def render(self, gauges: List[Tuple[str, Dict[str, str], float]]) -> str:
+        lines: List[str] = []
+        emitted: Set[str] = set()
+
+        def header(name: str):
+            if name in emitted:
+                return
+            emitted.add(name)
+            kind, help_ = self._help.get(name, ("untyped", ""))
+            if help_:
+                lines.append(f"# HELP {name} {help_}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), v in sorted(self._counters.items()):
+            header(name)
+            lines.append(f"{name}{self._fmt_labels(labels)} {v:g}")
+        for (name, labels), h in sorted(self._hist.items()):
+            header(name)
+            for i, b in enumerate(self.BUCKETS):
+                lines.append(f"{name}_bucket{self._fmt_labels(labels + (('le', f'{b:g}'),))} {h[i]:g}")
+            lines.append(f"{name}_bucket{self._fmt_labels(labels + (('le', '+Inf'),))} {h[-1]:g}")
+            lines.append(f"{name}_sum{self._fmt_labels(labels)} {h[-2]:.6f}")
+            lines.append(f"{name}_count{self._fmt_labels(labels)} {h[-1]:g}")
+        for name, labels, v in gauges:
+            header(name)
+            lines.append(f"{name}{self._fmt_labels(tuple(sorted(labels.items())))} {v:g}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+METRICS.describe("lnp_http_request_duration_seconds", "histogram", "Service request latency per route")
+METRICS.describe("lnp_upstream_request_duration_seconds", "histogram", "Upstream GET latency per path template")
+METRICS.describe("lnp_upstream_401_total", "counter", "Upstream 401 responses that triggered a token refresh")
+METRICS.describe("lnp_token_refresh_total", "counter", "Token capture attempts by result")
+METRICS.describe("lnp_playwright_restarts_total", "counter", "Playwright driver/context restarts")
+METRICS.describe("lnp_recaptcha_seen_total", "counter", "/Authorize/recaptcha requests seen while capturing")
+METRICS.describe("lnp_token_age_seconds", "gauge", "Age of the current token per sex")
+METRICS.describe("lnp_token_expires_in_seconds", "gauge", "Time left on the current token per sex")
+METRICS.describe("lnp_httpx_pool_connections", "gauge", "httpx connection pool by state")
+METRICS.describe("lnp_upstream_concurrency", "gauge", "Upstream limiter window and usage")
+METRICS.describe("lnp_browser_recycles_total", "counter", "Browser context recycles by exceeded budget")
+METRICS.describe("lnp_browser_rss_bytes", "gauge", "RSS of the Playwright driver + Chromium process tree")
+METRICS.describe("lnp_browser_profile_bytes", "gauge", "Browser profile size on disk by part")
+METRICS.describe("lnp_upstream_breaker_opened_total", "counter", "Circuit breaker trips per upstream path template")
+METRICS.describe("lnp_upstream_breaker_open", "gauge", "1 while the circuit of a path template is not closed")
+
+# per-request phase timings (ms) for the Server-Timing header; set by middleware
+_req_timing: ContextVar[Optional[Dict[str, float]]] = ContextVar("lnp_req_timing", default=None)
+
+
+@contextmanager
+def timed(phase: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        d = _req_timing.get()
+        if d is not None:
+            d[phase] = d.get(phase, 0.0) + (time.perf_counter() - t0) * 1000
+
+
+def record_path(root: str, path: str) -> str:
+    """File under `root` holding the recorded payload of an upstream path (incl. query)."""
+    return os.path.join(root, quote(path, safe="") + ".json")
+
+
+def record_payload(path: str, body: bytes):
+    try:
+        os.makedirs(LNP_RECORD_DIR, exist_ok=True)
+        with open(record_path(LNP_RECORD_DIR, path), "wb") as f:
+            f.write(body)
+    except OSError as e:
+        dprint("Recording payload failed:", path, repr(e))
+
+
+def path_template(path: str) -> str:
+    """/teams/<uuid>/players?x=1 -> /teams/{id}/players"""
+    path = path.split("?", 1)[0]
+    return "/".join("{id}" if is_uuid(seg) else seg for seg in path.split("/"))
+
+
+# background tasks (revalidation etc.) – keep refs so they are not GC'd mid-flight
+_bg_tasks: Set[asyncio.Task] = set()
+
+
+def spawn_bg(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _bg_tasks.add(task)
+    task.add_done_callback(_bg_tasks.discard)
+    return task
+
+
+async def cancel_bg_tasks():
+    tasks = list(_bg_tasks)
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    _bg_tasks.clear()
+
+
+def jwt_exp_ms(token: str) -> int:
+    """`exp` claim of a JWT in ms, 0 if missing/undecodable (signature is not checked)."""
+    try:
+        part = token.split(".")[1]
+        part += "=" * (-len(part) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(part))
+        exp = claims.get("exp") if isinstance(claims, dict) else None
+        return int(float(exp) * 1000) if exp else 0
+    except Exception:
+        return 0
+
+
+def capture_allowed(url: str, resource_type: str) -> bool:
+    if resource_type in CAPTURE_BLOCK_TYPES:
+        return False
+    host = (httpx.URL(url).host or "").lower()
+    return any(host == h or host.endswith("." + h) for h in CAPTURE_ALLOW_HOSTS)
+
+
+class TokenBucket:
+    """
+    Async token bucket; rate <= 0 means unlimited.
+    Waiters get tokens by priority (lower first), then FIFO.
+    """
+
+    def __init__(self, rate_per_s: float, burst: Optional[float] = None):
+        self.rate = rate_per_s
+        self.burst = burst if burst is not None else max(1.0, rate_per_s)
+        self._tokens = self.burst
+        self._at = time.monotonic()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def _refill(self):
+        t = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (t - self._at) * self.rate)
+        self._at = t
+
+    def _schedule(self):
+        """Arm the timer that hands out the next token, if someone waits for it."""
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        if self._timer is None and self._waiters:
+            wait_s = max(0.0, (1 - self._tokens) / self.rate)
+            self._timer = asyncio.get_running_loop().call_later(wait_s, self._dispatch)
+
+    def _dispatch(self):
+        self._timer = None
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            _, _, fut = heapq.heappop(self._waiters)
+            if fut.done():
+                continue
+            self._tokens -= 1
+            fut.set_result(None)
+        self._schedule()
+
+    async def take(self, priority: int = 0):
+        if self.rate <= 0:
+            return
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._seq += 1
+        heapq.heappush(self._waiters, (priority, self._seq, fut))
+        self._schedule()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # token was handed to us right before cancellation: give it back
+                self._tokens = min(self.burst, self._tokens + 1)
+                self._schedule()
+            raise
+
+
 @dataclass
 class TokenState:
     token: str = ""
     token_src: str = ""
     token_at_ms: int = 0
+    # from JWT `exp`; falls back to token_at_ms + TOKEN_TTL_MS
+    expires_at_ms: int = 0
+
+    @classmethod
+    def captured(cls, token: str, src: str) -> "TokenState":
+        at = now_ms()
+        exp = jwt_exp_ms(token)
+        if exp <= at:
+            exp = at + TOKEN_TTL_MS
+        return cls(token=token, token_src=src, token_at_ms=at, expires_at_ms=exp)
+
+    def expires_in_ms(self) -> int:
+        return self.expires_at_ms - now_ms()
+
+    def is_expired(self) -> bool:
+        return not self.token or self.expires_in_ms() <= TOKEN_EXPIRY_SKEW_MS
+
+    def has_jwt_exp(self) -> bool:
+        """False when expires_at_ms is only the TOKEN_TTL_MS guess."""
+        return jwt_exp_ms(self.token) > self.token_at_ms
+
+    def refresh_due_at_ms(self) -> int:
+        lifetime = max(0, self.expires_at_ms - self.token_at_ms)
+        return self.expires_at_ms - min(TOKEN_REFRESH_MARGIN_MS, lifetime // 3)
+
+
+@dataclass
+class RefreshStats:
+    attempts: int = 0
+    successes: int = 0
+    failures: int = 0
+    last_ms: int = 0
+    total_ms: int = 0
+    last_error: str = ""
+    last_at_ms: int = 0
+    last_bytes: int = 0
+    total_bytes: int = 0
+    last_blocked: int = 0
+
+    def record(self, started_ms: int, err: Optional[Exception] = None, nbytes: int = 0, blocked: int = 0):
+        took = now_ms() - started_ms
+        self.attempts += 1
+        self.last_ms = took
+        self.total_ms += took
+        self.last_at_ms = now_ms()
+        self.last_bytes = nbytes
+        self.total_bytes += nbytes
+        self.last_blocked = blocked
+        if err is None:
+            self.successes += 1
+        else:
+            self.failures += 1
+            self.last_error = repr(err)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "attempts": self.attempts,
+            "successes": self.successes,
+            "failures": self.failures,
+            "success_rate": round(self.successes / self.attempts, 3) if self.attempts else None,
+            "last_ms": self.last_ms,
+            "avg_ms": round(self.total_ms / self.attempts) if self.attempts else None,
+            "last_error": self.last_error or None,
+            "last_at_ms": self.last_at_ms or None,
+            "last_bytes": self.last_bytes,
+            "avg_bytes": round(self.total_bytes / self.attempts) if self.attempts else None,
+            "last_blocked_requests": self.last_blocked,
+        }
+
+
+@dataclass
+class PoolMember:
+    """One browser page capturing tokens for a sex; quarantined + recycled when unhealthy."""
+    sex: str
+    slot: int
+    page: Optional[Page] = None
+    state: TokenState = field(default_factory=TokenState)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    failures: int = 0
+    quarantined_until_ms: int = 0
+    uses: int = 0
+    # traffic of the current refresh navigation
+    nav_bytes: int = 0
+    nav_blocked: int = 0
+
+    def is_quarantined(self) -> bool:
+        return now_ms() < self.quarantined_until_ms
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "slot": self.slot,
+            "has_token": bool(self.state.token),
+            "expires_in_ms": self.state.expires_in_ms() if self.state.token else None,
+            "quarantined_ms": max(0, self.quarantined_until_ms - now_ms()),
+            "failures": self.failures,
+            "uses": self.uses,
+        }
+
+
+# profile directories holding only caches; Cookies, Local Storage, IndexedDB etc. are kept
+PROFILE_CACHE_DIRS = {
+    "Cache", "Code Cache", "GPUCache", "GrShaderCache", "GraphiteDawnCache", "DawnCache",
+    "DawnGraphiteCache", "DawnWebGPUCache", "ShaderCache", "CacheStorage", "ScriptCache",
+    "Crashpad", "BrowserMetrics", "component_crx_cache", "optimization_guide_model_store",
+}
+
+
+def dir_size(path: str) -> int:
+    total = 0
+    for dirpath, _, files in os.walk(path):
+        for f in files:
+            try:
+                total += os.lstat(os.path.join(dirpath, f)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def profile_sizes(root: str) -> Tuple[int, int]:
+    """(total, prunable cache) bytes of a browser profile."""
+    total = cache = 0
+    for dirpath, dirnames, files in os.walk(root):
+        for d in [d for d in dirnames if d in PROFILE_CACHE_DIRS]:
+            dirnames.remove(d)
+            n = dir_size(os.path.join(dirpath, d))
+            total += n
+            cache += n
+        for f in files:
+            try:
+                total += os.lstat(os.path.join(dirpath, f)).st_size
+            except OSError:
+                pass
+    return total, cache
+
+
+def prune_profile(root: str) -> int:
+    """Delete the cache directories of a (closed) profile; returns bytes freed."""
+    freed = 0
+    for dirpath, dirnames, _ in os.walk(root):
+        for d in [d for d in dirnames if d in PROFILE_CACHE_DIRS]:
+            dirnames.remove(d)
+            path = os.path.join(dirpath, d)
+            freed += dir_size(path)
+            shutil.rmtree(path, ignore_errors=True)
+    return freed
+
+
+def process_tree_rss(root_pid: int) -> Optional[int]:
+    """
+    Summed RSS bytes of every descendant of root_pid (Playwright driver, Chromium and
+    its renderers). Shared pages are counted per process, so this is an upper bound.
+    Linux /proc only; None elsewhere.
+    """
+    if not os.path.isdir("/proc"):
+        return None
+    page = os.sysconf("SC_PAGE_SIZE")
+    children: Dict[int, List[int]] = {}
+    rss: Dict[int, int] = {}
+    for d in os.listdir("/proc"):
+        if not d.isdigit():
+            continue
+        try:
+            with open(f"/proc/{d}/stat", "rb") as f:
+                stat = f.read()
+            with open(f"/proc/{d}/statm", "rb") as f:
+                pages = int(f.read().split()[1])
+            # comm may contain spaces and parens: state, ppid follow the last ')'
+            ppid = int(stat.rsplit(b")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(d))
+        rss[int(d)] = pages * page
+    total = 0
+    stack = list(children.get(root_pid, ()))
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, ()))
+    return total
+
+
+class BrowserLifecycle:
+    """
+    Keeps the long-running Chromium bounded. Every BROWSER_CHECK_MS it measures the
+    RSS of the browser process tree and the profile size, and has the TokenProvider
+    recycle its context once RSS, age, navigations or prunable cache size is over
+    budget. Profile caches are pruned whenever the browser is (re)launched.
+    """
+
+    def __init__(self, tp: "TokenProvider"):
+        self.tp = tp
+        self._task: Optional[asyncio.Task] = None
+        self.rss_bytes: Optional[int] = None
+        self.profile_bytes = 0
+        self.cache_bytes = 0
+        self.pruned_bytes = 0
+        self.recycles = 0
+        self.last_reason = ""
+        self.last_recycle_ms = 0
+
+    def start(self):
+        if BROWSER_CHECK_MS > 0 and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def measure(self):
+        self.rss_bytes = await asyncio.to_thread(process_tree_rss, os.getpid())
+        self.profile_bytes, self.cache_bytes = await asyncio.to_thread(profile_sizes, LNP_USER_DATA_DIR)
+
+    def over_budget(self) -> str:
+        """Name of the first exceeded budget, or ""."""
+        mb = 1024 * 1024
+        if BROWSER_MAX_RSS_MB and self.rss_bytes and self.rss_bytes > BROWSER_MAX_RSS_MB * mb:
+            return "rss"
+        if BROWSER_MAX_AGE_MS and now_ms() - self.tp.launched_at_ms > BROWSER_MAX_AGE_MS:
+            return "age"
+        if BROWSER_MAX_NAVIGATIONS and self.tp.navigations >= BROWSER_MAX_NAVIGATIONS:
+            return "navigations"
+        if BROWSER_MAX_CACHE_MB and self.cache_bytes > BROWSER_MAX_CACHE_MB * mb:
+            return "cache"
+        return ""
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(BROWSER_CHECK_MS / 1000)
+            if not self.tp.browser_running():
+                continue
+            try:
+                await self.measure()
+                reason = self.over_budget()
+                if reason:
+                    dprint("Recycling browser context:", reason)
+                    await self.tp.recycle()
+                    self.recycles += 1
+                    self.last_reason = reason
+                    self.last_recycle_ms = now_ms()
+                    METRICS.inc("lnp_browser_recycles_total", {"reason": reason})
+                    await self.measure()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                dprint("Browser lifecycle check failed:", repr(e))
+
+    def stats(self) -> Dict[str, Any]:
+        mb = 1024 * 1024
+        return {
+            "running": self.tp.browser_running(),
+            "age_ms": now_ms() - self.tp.launched_at_ms if self.tp.browser_running() else None,
+            "navigations": self.tp.navigations,
+            "rss_mb": round(self.rss_bytes / mb, 1) if self.rss_bytes is not None else None,
+            "profile_mb": round(self.profile_bytes / mb, 1),
+            "cache_mb": round(self.cache_bytes / mb, 1),
+            "pruned_mb": round(self.pruned_bytes / mb, 1),
+            "recycles": self.recycles,
+            "last_recycle_reason": self.last_reason or None,
+            "last_recycle_at_ms": self.last_recycle_ms or None,
+        }
 
 
 class TokenProvider:
     """
     Captures Bearer token by loading LNP page and listening to requests.
     Uses persistent profile (user_data_dir) to survive recaptcha.
-    Keeps separate token state per sex (Male/Female) and separate page per sex.
-    Auto-restarts Playwright if driver connection drops.
+    Keeps a pool of TOKEN_POOL_SIZE pages per sex (Male/Female), each with its own token;
+    a member that fails to capture is quarantined and its page recycled.
+    Auto-restarts Playwright only if every member of a sex fails (driver likely dropped).
+    Tokens are persisted to LNP_TOKEN_CACHE_PATH and restored on start; Chromium is
+    launched only when a capture is actually needed, and recycled by BrowserLifecycle.
     """
 
     def __init__(self):
         self._pw = None
         self._ctx: Optional[BrowserContext] = None
-        self._pages: Dict[str, Page] = {}
-        self._state_by_sex: Dict[str, TokenState] = {}
-        self._locks: Dict[str, asyncio.Lock] = {}
+        self._launch_lock = asyncio.Lock()
+        self._launch_task: Optional[asyncio.Task] = None
+        self._pool: Dict[str, List[PoolMember]] = {}
+        self._rr: Dict[str, int] = {}
+        self._refresh_stats: Dict[str, RefreshStats] = {}
+        self.lifecycle = BrowserLifecycle(self)
+        self.launched_at_ms = 0
+        self.navigations = 0
 
         # bookkeeping for recaptcha diagnostics
         self._last_recaptcha_at: Dict[str, int] = {"Male": 0, "Female": 0}
 
+    def members(self, sex: str) -> List[PoolMember]:
+        if sex not in self._pool:
+            self._pool[sex] = [PoolMember(sex=sex, slot=i) for i in range(max(1, TOKEN_POOL_SIZE))]
+        return self._pool[sex]
+
+    def _live(self, sex: str) -> List[PoolMember]:
+        return [m for m in self.members(sex) if not m.is_quarantined() and not m.state.is_expired()]
+
     def state(self, sex: str) -> TokenState:
-        return self._state_by_sex.get(sex) or TokenState()
+        """Longest-lived usable token of the sex (empty state if none)."""
+        live = self._live(sex)
+        if not live:
+            return TokenState()
+        return max(live, key=lambda m: m.state.expires_at_ms).state
+
+    def next_state(self, sex: str) -> TokenState:
+        """Round-robin over live members, so requests spread across tokens."""
+        live = self._live(sex)
+        if not live:
+            return TokenState()
+        i = self._rr.get(sex, 0)
+        self._rr[sex] = i + 1
+        m = live[i % len(live)]
+        m.uses += 1
+        return m.state
+
+    def token_stats(self) -> Dict[str, Any]:
+        out = {}
+        for sex in ("Male", "Female"):
+            st = self.state(sex)
+            out[sex] = {
+                "has_token": bool(st.token),
+                "age_ms": (now_ms() - st.token_at_ms) if st.token else None,
+                "expires_in_ms": st.expires_in_ms() if st.token else None,
+                "refresh": self._refresh_stats.get(sex, RefreshStats()).as_dict(),
+                "pool": [m.as_dict() for m in self._pool.get(sex, [])],
+            }
+        return out
 
-    def _lock(self, sex: str) -> asyncio.Lock:
-        if sex not in self._locks:
-            self._locks[sex] = asyncio.Lock()
-        return self._locks[sex]
+    def browser_running(self) -> bool:
+        return self._ctx is not None
 
     async def start(self):
-        if self._pw and self._ctx:
-            return
+        self.lifecycle.start()
+        restored = self._restore_tokens()
+        if not restored:
+            # cold start: first request needs a capture anyway, get the browser going
+            self._launch_task = asyncio.create_task(self._launch_bg())
+
+    async def _launch_bg(self):
+        try:
+            await self._launch()
+        except Exception as e:
+            dprint("Background Playwright launch failed:", repr(e))
+
+    async def _launch(self):
+        async with self._launch_lock:
+            if self._pw and self._ctx:
+                return
+            await self._launch_locked()
 
+    async def _launch_locked(self):
+        fresh_profile = not os.path.isdir(LNP_USER_DATA_DIR)
+        if not fresh_profile:
+            # the browser is down: the only moment its caches can be dropped safely
+            self.lifecycle.pruned_bytes += await asyncio.to_thread(prune_profile, LNP_USER_DATA_DIR)
         dprint("Starting Playwright… headless=", HEADLESS, "interactive=", LNP_INTERACTIVE, "profile=", LNP_USER_DATA_DIR)
 
         self._pw = await async_playwright().start()
@@ -122,17 +823,90 @@ class TokenProvider:
             ],
         )
         self._ctx.set_default_timeout(25000)
+        self.launched_at_ms = now_ms()
+        self.navigations = 0
 
-        # create pages per sex lazily in refresh()
+        if fresh_profile and LNP_STORAGE_STATE and os.path.exists(LNP_STORAGE_STATE):
+            try:
+                with open(LNP_STORAGE_STATE, "rb") as f:
+                    cookies = (json_loads(f.read()) or {}).get("cookies") or []
+                await self._ctx.add_cookies(cookies)
+                dprint(f"Seeded new profile with {len(cookies)} cookies from", LNP_STORAGE_STATE)
+            except Exception as e:
+                dprint("Could not seed storage state:", repr(e))
+
+        # create pool pages lazily in refresh()
+
+    def _restore_tokens(self) -> int:
+        """Load still-valid persisted tokens into the pool; returns how many."""
+        if not LNP_TOKEN_CACHE_PATH or not os.path.exists(LNP_TOKEN_CACHE_PATH):
+            return 0
+        try:
+            with open(LNP_TOKEN_CACHE_PATH, "rb") as f:
+                saved = json_loads(f.read()) or {}
+        except (OSError, ValueError) as e:
+            dprint("Ignoring unreadable token cache:", repr(e))
+            return 0
+        if not isinstance(saved, dict):
+            dprint("Ignoring malformed token cache:", LNP_TOKEN_CACHE_PATH)
+            return 0
+        n = 0
+        for sex, rows in saved.items():
+            if sex not in ("Male", "Female") or not isinstance(rows, list):
+                continue
+            members = self.members(sex)
+            for row in rows:
+                try:
+                    slot = row["slot"]
+                    st = TokenState(
+                        token=str(row["token"]), token_src=str(row["src"]),
+                        token_at_ms=int(row["at"]), expires_at_ms=int(row["exp"]),
+                    )
+                    if not isinstance(slot, int) or not 0 <= slot < len(members):
+                        continue
+                except (KeyError, TypeError, ValueError):
+                    dprint("Skipping malformed token cache row for", sex)
+                    continue
+                if st.token and not st.is_expired():
+                    members[slot].state = st
+                    n += 1
+        dprint(f"Restored {n} token(s) from", LNP_TOKEN_CACHE_PATH)
+        return n
+
+    def _persist_tokens(self):
+        if not LNP_TOKEN_CACHE_PATH:
+            return
+        saved = {
+            sex: [
+                {"slot": m.slot, "token": m.state.token, "src": m.state.token_src,
+                 "at": m.state.token_at_ms, "exp": m.state.expires_at_ms}
+                for m in members
+                if not m.state.is_expired()
+            ]
+            for sex, members in self._pool.items()
+        }
+        tmp = LNP_TOKEN_CACHE_PATH + ".tmp"
+        try:
+            # bearer tokens: owner-only
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(json_dumps(saved))
+            os.replace(tmp, LNP_TOKEN_CACHE_PATH)
+        except OSError as e:
+            dprint("Could not persist tokens:", repr(e))
 
     async def stop(self):
+        await self.lifecycle.stop()
+        if self._launch_task:
+            await asyncio.gather(self._launch_task, return_exceptions=True)
+            self._launch_task = None
+        await self._close()
+
+    async def _close(self):
         try:
-            for _, p in list(self._pages.items()):
-                try:
-                    await p.close()
-                except Exception:
-                    pass
-            self._pages.clear()
+            for members in self._pool.values():
+                for m in members:
+                    await self._close_page(m)
 
             if self._ctx:
                 await self._ctx.close()
@@ -147,19 +921,67 @@ class TokenProvider:
 
     async def _restart(self):
         dprint("Restarting Playwright driver/context…")
-        await self.stop()
-        await self.start()
+        METRICS.inc("lnp_playwright_restarts_total")
+        await self._close()
+        await self._launch()
+
+    async def recycle(self):
+        """
+        Replace the browser context with a fresh one on the same, pruned, profile.
+        Chromium locks a profile, so old and new cannot run side by side. Instead, tokens
+        close to expiry are renewed on the old browser first, and the swap holds every
+        member lock: captures wait and requests go on with the tokens in memory.
+        The new pages each do a capture before the locks are released, so the first
+        capture after a recycle never lands on a cold browser.
+        """
+        members = [m for ms in self._pool.values() for m in ms]
+        for m in members:
+            if m.state.token and not m.is_quarantined() and m.state.expires_in_ms() < BROWSER_SWAP_TOKEN_MS:
+                try:
+                    await self.refresh_member(m, stale_token=m.state.token)
+                except Exception as e:
+                    dprint(f"Pre-recycle refresh [{m.sex}#{m.slot}] failed:", repr(e))
+
+        warm = [m for m in members if m.page and not m.is_quarantined()]
+        async with AsyncExitStack() as stack:
+            for m in members:
+                await stack.enter_async_context(m.lock)
+            async with self._launch_lock:
+                await self._close()
+                await self._launch_locked()
+            for m in warm:
+                try:
+                    await self._capture(m)
+                except Exception as e:
+                    dprint(f"Pre-warm [{m.sex}#{m.slot}] failed:", repr(e))
+                    await self._quarantine(m)
+        self._persist_tokens()
+
+    async def _close_page(self, m: PoolMember):
+        page, m.page = m.page, None
+        if page:
+            try:
+                await page.close()
+            except Exception:
+                pass
+
+    async def _quarantine(self, m: PoolMember):
+        m.failures += 1
+        m.quarantined_until_ms = now_ms() + TOKEN_POOL_QUARANTINE_MS
+        dprint(f"Quarantining token page [{m.sex}#{m.slot}] for {TOKEN_POOL_QUARANTINE_MS} ms")
+        await self._close_page(m)
 
-    async def _ensure_page(self, sex: str) -> Page:
+    async def _ensure_page(self, m: PoolMember) -> Page:
         if not self._ctx:
-            raise RuntimeError("TokenProvider not started")
+            await self._launch()
 
-        if sex in self._pages:
-            return self._pages[sex]
+        if m.page:
+            return m.page
 
         page = await self._ctx.new_page()
+        sex = m.sex
 
-        # Attach request listener dedicated for this sex
+        # Attach request listener dedicated for this pool member
         async def on_request(req):
             url = req.url
             if "competition-api-pro.laczynaspilka.pl" not in url:
@@ -169,108 +991,710 @@ class TokenProvider:
             if auth and auth.lower().startswith("bearer "):
                 tok = auth.split(" ", 1)[1].strip()
                 if tok and tok.count(".") >= 2:
-                    self._state_by_sex[sex] = TokenState(token=tok, token_src=url, token_at_ms=now_ms())
-                    dprint(f"Captured Bearer [{sex}] from:", url)
+                    m.state = TokenState.captured(tok, url)
+                    dprint(f"Captured Bearer [{sex}#{m.slot}] from:", url)
             else:
                 if "/Authorize/recaptcha" in url:
                     self._last_recaptcha_at[sex] = now_ms()
+                    METRICS.inc("lnp_recaptcha_seen_total", {"sex": sex})
                     if DEBUG:
                         dprint(f"REQ(no-auth) [{sex}]:", url)
 
+        async def on_request_finished(req):
+            try:
+                sizes = await req.sizes()
+                m.nav_bytes += int(sizes.get("responseBodySize", 0)) + int(sizes.get("responseHeadersSize", 0))
+            except Exception:
+                pass
+
         page.on("request", on_request)
+        page.on("requestfinished", on_request_finished)
+
+        if CAPTURE_LIGHTWEIGHT:
+            # note: routing also bypasses the HTTP cache for this page
+            async def route(rt):
+                req = rt.request
+                if capture_allowed(req.url, req.resource_type):
+                    await rt.continue_()
+                else:
+                    m.nav_blocked += 1
+                    await rt.abort()
 
-        self._pages[sex] = page
+            await page.route("**/*", route)
+
+        m.page = page
         return page
 
-    async def refresh(self, sex: str) -> TokenState:
-        async with self._lock(sex):
-            # someone might have refreshed already
+    async def refresh(self, sex: str, stale_token: Optional[str] = None) -> TokenState:
+        """
+        Return a usable token, capturing a new one unless some member already holds one.
+        `stale_token` (e.g. after 401) excludes that token and recaptures on its member.
+        Failing members are quarantined and the next one is tried; Playwright is
+        restarted only when all of them fail.
+        """
+        last_err: Optional[Exception] = None
+
+        for pw_restart_try in range(0, PLAYWRIGHT_RESTART_RETRIES + 1):
+            if pw_restart_try > 0:
+                await self._restart()
+                for m in self.members(sex):
+                    m.quarantined_until_ms = 0
+
             st = self.state(sex)
-            if st.token and (now_ms() - st.token_at_ms) <= TOKEN_TTL_MS:
+            if st.token and st.token != stale_token and now_ms() < st.refresh_due_at_ms():
                 return st
 
-            last_err: Optional[Exception] = None
-
-            for pw_restart_try in range(0, PLAYWRIGHT_RESTART_RETRIES + 1):
-                if pw_restart_try > 0:
-                    await self._restart()
-
-                page = await self._ensure_page(sex)
-
-                for attempt in range(1, CAPTURE_RETRIES + 1):
-                    ts = now_ms()
-                    url = f"{BASE_SITE}/rozgrywki?isAdvanceMode=false&genderType={sex}&__ts={ts}"
-                    dprint(f"Refreshing token [{sex}] (attempt {attempt}/{CAPTURE_RETRIES}) -> {url}")
-
-                    try:
-                        await page.goto(url, wait_until="domcontentloaded")
-                        await page.wait_for_timeout(250)
-
-                        # Detect LNP internal 404 route (often bot/recaptcha flow)
-                        cur_url = (page.url or "").lower()
-                        if "/rozgrywki/404" in cur_url:
-                            msg = (
-                                "LNP przekierowuje do /rozgrywki/404 (anti-bot/recaptcha). "
-                                "Uruchom serwis raz w trybie interaktywnym: HEADLESS=0 i LNP_INTERACTIVE=1 "
-                                "i w otwartej przeglądarce przejdź ewentualny challenge. "
-                                "Potem możesz wrócić na HEADLESS=1."
-                            )
-                            raise RuntimeError(msg)
-
-                        # Wait for bearer to appear
-                        deadline = now_ms() + CAPTURE_WAIT_MS
-                        while now_ms() < deadline:
-                            st = self.state(sex)
-                            if st.token and (now_ms() - st.token_at_ms) < CAPTURE_WAIT_MS:
+            # holder of the stale token first, then emptiest/oldest healthy members
+            candidates = sorted(
+                (m for m in self.members(sex) if not m.is_quarantined()),
+                key=lambda m: (m.state.token != stale_token, m.state.expires_at_ms),
+            )
+            for m in candidates:
+                try:
+                    return await self.refresh_member(m, stale_token)
+                except Exception as e:
+                    last_err = e
+                    await self._quarantine(m)
+
+            # try pw restart loop (driver may have died)
+            dprint("All pool members failed; will try restarting Playwright (if allowed).")
+
+        raise RuntimeError(f"No bearer captured after retries. Last error: {last_err!r}")
+
+    async def refresh_member(self, m: PoolMember, stale_token: Optional[str] = None) -> TokenState:
+        async with m.lock:
+            st = m.state
+            if st.token and st.token != stale_token and now_ms() < st.refresh_due_at_ms():
+                return st
+
+            started = now_ms()
+            stats = self._refresh_stats.setdefault(m.sex, RefreshStats())
+            m.nav_bytes = 0
+            m.nav_blocked = 0
+            try:
+                st = await self._capture(m)
+            except Exception as e:
+                stats.record(started, e, m.nav_bytes, m.nav_blocked)
+                METRICS.inc("lnp_token_refresh_total", {"sex": m.sex, "result": "error"})
+                raise
+            stats.record(started, None, m.nav_bytes, m.nav_blocked)
+            METRICS.inc("lnp_token_refresh_total", {"sex": m.sex, "result": "ok"})
+            m.failures = 0
+            self._persist_tokens()
+            return st
+
+    async def _capture(self, m: PoolMember) -> TokenState:
+        sex = m.sex
+        last_err: Optional[Exception] = None
+        page = await self._ensure_page(m)
+
+        for attempt in range(1, CAPTURE_RETRIES + 1):
+            ts = now_ms()
+            started = ts
+            url = f"{BASE_SITE}/rozgrywki?isAdvanceMode=false&genderType={sex}&__ts={ts}"
+            self.navigations += 1
+            dprint(f"Refreshing token [{sex}#{m.slot}] (attempt {attempt}/{CAPTURE_RETRIES}) -> {url}")
+
+            try:
+                await page.goto(url, wait_until="domcontentloaded")
+                await page.wait_for_timeout(250)
+
+                # Detect LNP internal 404 route (often bot/recaptcha flow)
+                cur_url = (page.url or "").lower()
+                if "/rozgrywki/404" in cur_url:
+                    msg = (
+                        "LNP przekierowuje do /rozgrywki/404 (anti-bot/recaptcha). "
+                        "Uruchom serwis raz w trybie interaktywnym: HEADLESS=0 i LNP_INTERACTIVE=1 "
+                        "i w otwartej przeglądarce przejdź ewentualny challenge. "
+                        "Potem możesz wrócić na HEADLESS=1."
+                    )
+                    raise RuntimeError(msg)
+
+                # Wait for bearer to appear
+                deadline = now_ms() + CAPTURE_WAIT_MS
+                while now_ms() < deadline:
+                    st = m.state
+                    if st.token and st.token_at_ms >= started:
+                        return st
+                    await page.wait_for_timeout(100)
+
+                # No bearer
+                # If we saw recaptcha recently, likely blocked
+                if (now_ms() - self._last_recaptcha_at.get(sex, 0)) < CAPTURE_WAIT_MS:
+                    if HEADLESS and not LNP_INTERACTIVE:
+                        raise RuntimeError(
+                            "Nie złapano Bearer tokena: widać /Authorize/recaptcha (anti-bot). "
+                            "Odpal raz: HEADLESS=0 oraz LNP_INTERACTIVE=1 i przejdź challenge w oknie przeglądarki."
+                        )
+
+                    # interactive mode: keep window; user can click/solve
+                    if LNP_INTERACTIVE and not HEADLESS:
+                        dprint("Interactive mode: waiting longer for manual challenge…")
+                        # wait extra 60s for manual solve
+                        extra_deadline = now_ms() + 60000
+                        while now_ms() < extra_deadline:
+                            st = m.state
+                            if st.token and st.token_at_ms >= started:
                                 return st
-                            await page.wait_for_timeout(100)
-
-                        # No bearer
-                        # If we saw recaptcha recently, likely blocked
-                        if (now_ms() - self._last_recaptcha_at.get(sex, 0)) < CAPTURE_WAIT_MS:
-                            if HEADLESS and not LNP_INTERACTIVE:
-                                raise RuntimeError(
-                                    "Nie złapano Bearer tokena: widać /Authorize/recaptcha (anti-bot). "
-                                    "Odpal raz: HEADLESS=0 oraz LNP_INTERACTIVE=1 i przejdź challenge w oknie przeglądarki."
-                                )
-
-                            # interactive mode: keep window; user can click/solve
-                            if LNP_INTERACTIVE and not HEADLESS:
-                                dprint("Interactive mode: waiting longer for manual challenge…")
-                                # wait extra 60s for manual solve
-                                extra_deadline = now_ms() + 60000
-                                while now_ms() < extra_deadline:
-                                    st = self.state(sex)
-                                    if st.token and (now_ms() - st.token_at_ms) < 60000:
-                                        return st
-                                    await page.wait_for_timeout(200)
-
-                        raise RuntimeError("No bearer captured (timeout).")
-                    except Exception as e:
-                        last_err = e
-                        dprint("Token refresh failed:", repr(e))
-                        # small backoff
-                        await asyncio.sleep(0.35)
-
-                # try pw restart loop (driver may have died)
-                dprint("All capture retries failed; will try restarting Playwright (if allowed).")
-
-            raise RuntimeError(f"No bearer captured after retries. Last error: {last_err!r}")
+                            await page.wait_for_timeout(200)
+
+                raise RuntimeError("No bearer captured (timeout).")
+            except Exception as e:
+                last_err = e
+                dprint("Token refresh failed:", repr(e))
+                # small backoff
+                await asyncio.sleep(0.35)
+
+        raise RuntimeError(f"No bearer captured on [{sex}#{m.slot}]. Last error: {last_err!r}")
+
+
+class BrowserlessTokenProvider(TokenProvider):
+    """
+    Base for token sources that must never start Playwright in this process: launches
+    and restarts are no-ops, so a failing capture ends in refresh()'s RuntimeError (503)
+    instead of a browser fighting other workers over LNP_USER_DATA_DIR.
+    """
+
+    async def start(self):
+        return
+
+    async def stop(self):
+        return
+
+    def browser_running(self) -> bool:
+        return False
+
+    async def _launch(self):
+        return
+
+    async def _launch_locked(self):
+        return
+
+    async def _restart(self):
+        return
+
+    async def recycle(self):
+        return
+
+    async def refresh(self, sex: str, stale_token: Optional[str] = None) -> TokenState:
+        """
+        A single capture attempt, no retry or restart rounds: the broker runs its own
+        retries, so repeating them here would only multiply its captures and keep the
+        request waiting for minutes. A failure is a 503; the member is not quarantined
+        (there is no page to recycle), repeated failures open the upstream breaker.
+        """
+        st = self.state(sex)
+        if st.token and st.token != stale_token and now_ms() < st.refresh_due_at_ms():
+            return st
+
+        # holder of the stale token first, then the emptiest/oldest member
+        m = min(self.members(sex), key=lambda m: (m.state.token != stale_token, m.state.expires_at_ms))
+        try:
+            return await self.refresh_member(m, stale_token)
+        except Exception as e:
+            raise RuntimeError(f"No bearer token available. Last error: {e!r}") from e
+
+
+class StaticTokenProvider(BrowserlessTokenProvider):
+    """
+    Token source without Playwright: every capture yields LNP_STATIC_TOKEN.
+    Used with LNP_BASE_API pointing at bench_mock_api.py.
+    """
+
+    def _persist_tokens(self):
+        return
+
+    async def _capture(self, m: PoolMember) -> TokenState:
+        m.state = TokenState.captured(LNP_STATIC_TOKEN, "static")
+        return m.state
+
+
+def _broker_tcp_addr(addr: str) -> Optional[Tuple[str, int]]:
+    m = re.match(r"^([\w.\-]+):(\d+)$", addr)
+    return (m.group(1), int(m.group(2))) if m else None
+
+
+class BrokerTokenProvider(BrowserlessTokenProvider):
+    """
+    Token source for API workers: no Playwright here, every capture asks the token
+    broker process (one browser for all workers) over LNP_BROKER_ADDR.
+    Pool slots map onto the broker's slots, so workers spread over its tokens too.
+    """
+
+    def _persist_tokens(self):
+        return  # the broker persists; workers would race on the file
+
+    async def _capture(self, m: PoolMember) -> TokenState:
+        # refresh_member only gets here when the member's token is stale or due
+        req = {"op": "token", "sex": m.sex, "slot": m.slot, "stale": m.state.token or None}
+        timeout_s = (CAPTURE_WAIT_MS * CAPTURE_RETRIES * (PLAYWRIGHT_RESTART_RETRIES + 1)) / 1000 + 30
+        try:
+            resp = await asyncio.wait_for(broker_call(LNP_BROKER_ADDR, req), timeout_s)
+        except (OSError, asyncio.TimeoutError, ValueError) as e:
+            raise RuntimeError(f"Token broker at {LNP_BROKER_ADDR} unavailable: {e!r}")
+        if resp.get("error"):
+            raise RuntimeError(f"Token broker: {resp['error']}")
+        m.state = TokenState(
+            token=resp["token"], token_src=resp["src"], token_at_ms=resp["at"], expires_at_ms=resp["exp"]
+        )
+        return m.state
+
+
+async def broker_call(addr: str, req: Dict[str, Any]) -> Dict[str, Any]:
+    """One request/response (a JSON line each way) on a fresh connection."""
+    tcp = _broker_tcp_addr(addr)
+    if tcp:
+        reader, writer = await asyncio.open_connection(*tcp)
+    else:
+        reader, writer = await asyncio.open_unix_connection(addr)
+    try:
+        writer.write(json_dumps(req) + b"\n")
+        await writer.drain()
+        line = await reader.readline()
+    finally:
+        writer.close()
+    if not line:
+        raise ValueError("empty broker response")
+    return json_loads(line)
+
+
+class TokenRefresher:
+    """
+    Keeps a fresh Bearer token on every pool member ahead of its expiry, so requests
+    use the current token and never wait on Playwright. A sex is watched from its first
+    use until TOKEN_REFRESH_IDLE_MS without one. Tokens without a JWT `exp` are left to
+    on-demand refresh: their lifetime is only the TOKEN_TTL_MS guess, and renewing
+    them ahead would mean a page load every few seconds.
+    """
+
+    def __init__(self, tp: TokenProvider):
+        self.tp = tp
+        self._tasks: Dict[Tuple[str, int], asyncio.Task] = {}
+        self._used_at_ms: Dict[str, int] = {}
+
+    def watch(self, sex: str):
+        if not TOKEN_REFRESH_AHEAD:
+            return
+        self._used_at_ms[sex] = now_ms()
+        for m in self.tp.members(sex):
+            key = (sex, m.slot)
+            if key not in self._tasks:
+                self._tasks[key] = asyncio.create_task(self._loop(m))
+
+    async def _loop(self, m: PoolMember):
+        try:
+            await self._refresh_ahead(m)
+        finally:
+            self._tasks.pop((m.sex, m.slot), None)
+
+    async def _refresh_ahead(self, m: PoolMember):
+        backoff_ms = 1000
+        while True:
+            idle_ms = now_ms() - self._used_at_ms.get(m.sex, 0)
+            if idle_ms > TOKEN_REFRESH_IDLE_MS:
+                dprint(f"Token refresh-ahead [{m.sex}#{m.slot}] idle, stopping")
+                return
+            st = m.state
+            if st.token and not st.has_jwt_exp():
+                await asyncio.sleep(min(TOKEN_REFRESH_IDLE_MS - idle_ms + 1, 30000) / 1000)
+                continue
+            wait_ms = max(
+                (st.refresh_due_at_ms() - now_ms()) if st.token else 0,
+                m.quarantined_until_ms - now_ms(),
+            )
+            if wait_ms > 0:
+                await asyncio.sleep(min(wait_ms, TOKEN_REFRESH_IDLE_MS - idle_ms + 1, 30000) / 1000)
+                continue
+            try:
+                await self.tp.refresh_member(m, stale_token=st.token or None)
+                backoff_ms = 1000
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                dprint(f"Background token refresh [{m.sex}#{m.slot}] failed:", repr(e))
+                await self.tp._quarantine(m)
+                await asyncio.sleep(backoff_ms / 1000)
+                backoff_ms = min(backoff_ms * 2, 60000)
+
+    async def stop(self):
+        tasks = list(self._tasks.values())
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+
+async def run_token_broker(tp: TokenProvider, refresher: TokenRefresher, addr: str = LNP_BROKER_ADDR):
+    """
+    Token broker: the only process owning Playwright. Serves
+    {"op": "token", "sex", "slot", "stale"} with that slot's token when it is
+    still good, otherwise with whatever tp.refresh() captures; the refresher
+    keeps tokens ahead of expiry so most calls are answered from memory.
+    """
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            req = json_loads(await reader.readline()) or {}
+            sex = req.get("sex")
+            if req.get("op") != "token" or sex not in ("Male", "Female"):
+                resp: Dict[str, Any] = {"error": "bad request"}
+            else:
+                refresher.watch(sex)
+                stale = req.get("stale")
+                members = tp.members(sex)
+                m = members[int(req.get("slot") or 0) % len(members)]
+                st = m.state
+                try:
+                    if not (st.token and st.token != stale and not m.is_quarantined()
+                            and now_ms() < st.refresh_due_at_ms()):
+                        st = await tp.refresh(sex, stale_token=stale)
+                    resp = {"token": st.token, "src": st.token_src, "at": st.token_at_ms, "exp": st.expires_at_ms}
+                except RuntimeError as e:
+                    resp = {"error": str(e)}
+            writer.write(json_dumps(resp) + b"\n")
+            await writer.drain()
+        except (OSError, ValueError) as e:
+            dprint("Token broker client error:", repr(e))
+        finally:
+            writer.close()
+
+    tcp = _broker_tcp_addr(addr)
+    if tcp:
+        server = await asyncio.start_server(handle, *tcp)
+    else:
+        if os.path.exists(addr):
+            os.unlink(addr)
+        server = await asyncio.start_unix_server(handle, addr)
+
+    await tp.start()
+    print(f"Token broker listening on {addr}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await refresher.stop()
+        await tp.stop()
+        if not tcp and os.path.exists(addr):
+            os.unlink(addr)
+
+
+# TTL classes: dictionaries change ~weekly, tables/squads/stats during matchdays
+CACHE_TTL_RULES = [
+    (re.compile(r"^/seasons/dictionaries$"), CACHE_TTL_LONG_MS),
+    (re.compile(r"/league-groups$"), CACHE_TTL_LONG_MS),
+    (re.compile(r"/play-dictionaries$"), CACHE_TTL_LONG_MS),
+    (re.compile(r"^/plays/[^/]+/(tables|queues)"), CACHE_TTL_SHORT_MS),
+    (re.compile(r"^/teams/[^/]+/players$"), CACHE_TTL_SHORT_MS),
+    (re.compile(r"/stats$"), CACHE_TTL_SHORT_MS),
+]
+
+
+def cache_ttl_for(path: str) -> int:
+    for rx, ttl in CACHE_TTL_RULES:
+        if rx.search(path):
+            return ttl
+    return 0
+
+
+_UNPARSED = object()
+
+
+@dataclass
+class CacheEntry:
+    raw: bytes
+    fetched_at_ms: int
+    ttl_ms: int
+    # upstream validators for conditional revalidation
+    etag: str = ""
+    last_modified: str = ""
+    _value: Any = field(default=_UNPARSED, repr=False)
+
+    @property
+    def value(self) -> Any:
+        """Parsed body; parsed once, on first use (passthrough readers never pay for it)."""
+        if self._value is _UNPARSED:
+            self._value = json_loads(self.raw)
+        return self._value
+
+    def age_ms(self) -> int:
+        return now_ms() - self.fetched_at_ms
+
+    def is_fresh(self) -> bool:
+        return self.age_ms() <= self.ttl_ms
+
+    def is_servable(self) -> bool:
+        return self.age_ms() <= self.ttl_ms + CACHE_STALE_MS
+
+
+class ResponseCache:
+    """
+    Bounded in-memory LRU of upstream JSON bodies (raw bytes), keyed by (sex, path).
+    Entries past TTL stay servable for CACHE_STALE_MS (stale-while-revalidate).
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Tuple[str, str], CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, sex: str, path: str) -> Optional[CacheEntry]:
+        key = (sex, path)
+        ent = self._data.get(key)
+        if ent is None:
+            return None
+        if not ent.is_servable():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return ent
+
+    def peek(self, sex: str, path: str) -> Optional[CacheEntry]:
+        """Entry regardless of age, without touching LRU order or counters."""
+        return self._data.get((sex, path))
+
+    def put(
+        self, sex: str, path: str, raw: bytes, ttl_ms: int, etag: str = "", last_modified: str = "", value: Any = _UNPARSED
+    ):
+        key = (sex, path)
+        self._data[key] = CacheEntry(
+            raw=raw, fetched_at_ms=now_ms(), ttl_ms=ttl_ms, etag=etag, last_modified=last_modified, _value=value
+        )
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+        }
+
+
+class UpstreamLimiter:
+    """
+    Shared by all upstream calls: a token bucket caps the request rate, and an
+    AIMD window caps concurrency. The window halves on 429/5xx/transport errors,
+    401 bursts or latency well above baseline, and grows by ~1 per window of
+    healthy responses. Waiters are served by priority, then FIFO, both for a
+    concurrency slot and for a rate token: a bulk request holding a slot does
+    not keep an interactive one behind it once the rate is the limit.
+    """
+
+    def __init__(
+        self,
+        rate_per_s: float = UPSTREAM_RATE_PER_S,
+        min_limit: int = UPSTREAM_MIN_CONCURRENCY,
+        max_limit: int = UPSTREAM_MAX_CONCURRENCY,
+    ):
+        self.bucket = TokenBucket(rate_per_s)
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = 0
+        self._last_decrease = 0.0
+        self._recent_401: List[float] = []
+        self._lat_fast = 0.0
+        self._lat_base = 0.0
+        self.decreases = 0
+        self.throttled = 0
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            _, _, fut = heapq.heappop(self._waiters)
+            if fut.done():
+                continue
+            self.in_flight += 1
+            fut.set_result(None)
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE):
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+        else:
+            self.throttled += 1
+            fut = asyncio.get_running_loop().create_future()
+            self._seq += 1
+            heapq.heappush(self._waiters, (priority, self._seq, fut))
+            try:
+                await fut
+            except asyncio.CancelledError:
+                if fut.done() and not fut.cancelled():
+                    # slot was handed to us right before cancellation
+                    self.release()
+                raise
+        try:
+            await self.bucket.take(priority)
+        except BaseException:
+            self.release()
+            raise
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def _decrease(self, reason: str):
+        t = time.monotonic()
+        if t - self._last_decrease < 1.0:
+            return
+        self._last_decrease = t
+        self.limit = max(float(self.min_limit), self.limit / 2)
+        self.decreases += 1
+        dprint("Upstream limiter backoff:", reason, "limit=", int(self.limit))
+
+    def feedback(self, status: int, latency_ms: float):
+        if status == 429 or status >= 500:
+            self._decrease(f"status {status}")
+            return
+
+        if status == 401:
+            t = time.monotonic()
+            self._recent_401 = [x for x in self._recent_401 if t - x < 10.0] + [t]
+            if len(self._recent_401) >= 3:
+                self._decrease("401 burst")
+            return
+
+        # latency EWMAs: fast tracks now, base tracks the healthy norm
+        if not self._lat_base:
+            self._lat_base = self._lat_fast = latency_ms
+        self._lat_fast = 0.7 * self._lat_fast + 0.3 * latency_ms
+        self._lat_base = 0.98 * self._lat_base + 0.02 * latency_ms
+        if self._lat_fast > 2.0 * self._lat_base and self._lat_fast > 500:
+            self._decrease("latency")
+            return
+
+        self.limit = min(float(self.max_limit), self.limit + 1.0 / max(1.0, self.limit))
+        self._wake()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "rate_per_s": self.bucket.rate,
+            "decreases": self.decreases,
+            "throttled": self.throttled,
+            "latency_ms": {"recent": round(self._lat_fast), "baseline": round(self._lat_base)},
+        }
+
+
+class CircuitBreaker:
+    """
+    closed -> open after BREAKER_FAILURES consecutive failures (401 after a
+    token refresh, 403, 429, 5xx, transport errors, token capture failures). While open, callers fail fast;
+    once the open period is over a single probe is let through (half-open).
+    A successful probe closes the breaker, a failed one reopens it for twice
+    as long (up to BREAKER_MAX_OPEN_MS).
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.open_ms = BREAKER_OPEN_MS
+        self.opened_at_ms = 0
+        self.probing = False
+        self.opened = 0
+        self.rejected = 0
+        self.last_error = ""
+
+    def retry_after_ms(self) -> int:
+        return max(0, self.opened_at_ms + self.open_ms - now_ms())
+
+    def allow(self) -> bool:
+        """True if a request may go upstream now; in half-open only the one probe gets True."""
+        if self.state == self.OPEN and self.retry_after_ms() == 0:
+            self.state = self.HALF_OPEN
+        if self.state == self.CLOSED or (self.state == self.HALF_OPEN and not self.probing):
+            self.probing = self.state == self.HALF_OPEN
+            return True
+        self.rejected += 1
+        return False
+
+    def success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.open_ms = BREAKER_OPEN_MS
+        self.probing = False
+
+    def failure(self, error: str):
+        self.last_error = error
+        self.failures += 1
+        if self.state == self.HALF_OPEN:
+            self.open_ms = min(BREAKER_MAX_OPEN_MS, self.open_ms * 2)
+        elif self.failures < BREAKER_FAILURES:
+            return
+        self.state = self.OPEN
+        self.opened_at_ms = now_ms()
+        self.probing = False
+        self.opened += 1
+
+    def abandon(self):
+        """The probe was cancelled before an outcome: let the next caller probe."""
+        self.probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_after_ms": self.retry_after_ms() if self.state == self.OPEN else 0,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "last_error": self.last_error,
+        }
+
+
+def is_breaker_failure(status: int) -> bool:
+    # a 401 only surfaces here when the retry with a freshly captured token failed too
+    return status in (401, 403, 429) or status >= 500
+
+
+@dataclass
+class _Flight:
+    task: asyncio.Task
+    waiters: int = 0
 
 
 class ApiClient:
     """
     Async HTTP client (httpx) + auto refresh on 401.
+    Successful GETs are cached per TTL class (see CACHE_TTL_RULES).
+    Identical in-flight GETs (same sex + path) share one upstream request.
+    Every upstream GET passes through one process-wide UpstreamLimiter and the
+    CircuitBreaker of its (sex, path template); 404s are cached negatively.
     """
 
-    def __init__(self, tp: TokenProvider):
+    def __init__(self, tp: TokenProvider, refresher: Optional[TokenRefresher] = None):
         self.tp = tp
+        self.refresher = refresher
         self.client: Optional[httpx.AsyncClient] = None
+        self.cache = ResponseCache()
+        self.limiter = UpstreamLimiter()
+        self._revalidating: Set[Tuple[str, str]] = set()
+        self._inflight: Dict[Tuple[str, str], _Flight] = {}
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        # (sex, path) -> (expires at ms, upstream 404 detail)
+        self._negative: Dict[Tuple[str, str], Tuple[int, str]] = {}
+        self.upstream_requests = 0
+        self.deduplicated = 0
+        self.negative_hits = 0
+        self.breaker_stale = 0
 
     async def start(self):
         if self.client:
             return
-        limits = httpx.Limits(max_connections=25, max_keepalive_connections=10)
+        limits = httpx.Limits(max_connections=UPSTREAM_MAX_CONCURRENCY, max_keepalive_connections=10)
         self.client = httpx.AsyncClient(
             timeout=httpx.Timeout(25.0),
             limits=limits,
@@ -289,20 +1713,224 @@ class ApiClient:
         self.client = None
 
     async def ensure_token(self, sex: str):
+        # renewal ahead of expiry happens in TokenRefresher; only block when we have nothing usable
+        if self.refresher:
+            self.refresher.watch(sex)
         st = self.tp.state(sex)
-        if not st.token or (now_ms() - st.token_at_ms) > TOKEN_TTL_MS:
+        if st.is_expired():
             await self.tp.refresh(sex)
 
-    def _auth_headers(self, sex: str) -> Dict[str, str]:
-        st = self.tp.state(sex)
+    def _auth_headers(self, st: TokenState) -> Dict[str, str]:
         return {"authorization": f"Bearer {st.token}"}
 
-    async def get_json(self, sex: str, path: str) -> Any:
+    def _cached(self, sex: str, path: str) -> Optional[CacheEntry]:
+        ent = self.cache.get(sex, path)
+        if ent is None:
+            self.cache.misses += 1
+            return None
+        if ent.is_fresh():
+            self.cache.hits += 1
+        else:
+            self.cache.stale_hits += 1
+            self._revalidate(sex, path)
+        return ent
+
+    async def get_raw(self, sex: str, path: str, priority: int = PRIORITY_INTERACTIVE) -> bytes:
+        """Upstream body bytes, unparsed (for endpoints that pass data through untouched)."""
+        ent = self._cached(sex, path) if cache_ttl_for(path) > 0 else None
+        if ent is not None:
+            return ent.raw
+        return await self._fetch_raw(sex, path, priority)
+
+    async def get_json(
+        self, sex: str, path: str, priority: int = PRIORITY_INTERACTIVE, max_age_ms: Optional[int] = None
+    ) -> Any:
+        """`max_age_ms`: a cached body older than this is revalidated upstream first (pollers)."""
+        if cache_ttl_for(path) <= 0:
+            return json_loads(await self._fetch_raw(sex, path, priority))
+
+        prev = self.cache.peek(sex, path)
+        if max_age_ms is None or (prev is not None and prev.age_ms() <= max_age_ms):
+            ent = self._cached(sex, path)
+            if ent is not None:
+                return ent.value
+
+        raw = await self._fetch_raw(sex, path, priority)
+        ent = self.cache.peek(sex, path)
+        if ent is not None and ent.raw is raw:
+            return ent.value
+        return json_loads(raw)
+
+    def _revalidate(self, sex: str, path: str):
+        key = (sex, path)
+        if key in self._revalidating:
+            return
+
+        async def run():
+            try:
+                await self._fetch_raw(sex, path, PRIORITY_BULK)
+            except Exception as e:
+                dprint("Background refresh failed for", path, repr(e))
+            finally:
+                self._revalidating.discard(key)
+
+        self._revalidating.add(key)
+        spawn_bg(run())
+
+    async def _fetch_raw(self, sex: str, path: str, priority: int = PRIORITY_INTERACTIVE) -> bytes:
+        """
+        Single-flight: concurrent callers await one shared task; its result or
+        error reaches all of them. shield() keeps a cancelled caller from
+        cancelling the request for the others; the upstream request itself is
+        cancelled once its last waiter is gone.
+        """
+        key = (sex, path)
+        neg = self._negative.get(key)
+        if neg is not None:
+            if neg[0] > now_ms():
+                self.negative_hits += 1
+                raise HTTPException(status_code=404, detail=neg[1])
+            del self._negative[key]
+
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self.deduplicated += 1
+        else:
+            breaker = self.breaker(sex, path)
+            if not breaker.allow():
+                return self._breaker_fallback(sex, path, breaker)
+            self.upstream_requests += 1
+            flight = _Flight(asyncio.create_task(self._guarded_request(sex, path, priority, breaker)))
+            self._inflight[key] = flight
+
+            def done(_, flight=flight):
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+
+            flight.task.add_done_callback(done)
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+                flight.task.cancel()
+
+    def breaker(self, sex: str, path: str) -> CircuitBreaker:
+        key = (sex, path_template(path))
+        b = self._breakers.get(key)
+        if b is None:
+            b = self._breakers[key] = CircuitBreaker()
+        return b
+
+    def _breaker_fallback(self, sex: str, path: str, breaker: CircuitBreaker) -> bytes:
+        """Open circuit: the last body we have for the path, however old, or a fast 503."""
+        prev = self.cache.peek(sex, path)
+        if prev is not None:
+            self.breaker_stale += 1
+            return prev.raw
+        retry_after = max(1, -(-breaker.retry_after_ms() // 1000))
+        raise HTTPException(
+            status_code=503,
+            detail=f"Upstream unavailable ({breaker.last_error}); circuit open for {path_template(path)}",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    async def _guarded_request(self, sex: str, path: str, priority: int, breaker: CircuitBreaker) -> bytes:
+        """_request_raw, reporting its outcome to the breaker and remembering 404s."""
+        try:
+            raw = await self._request_raw(sex, path, priority)
+        except HTTPException as e:
+            if is_breaker_failure(e.status_code):
+                self._breaker_failure(sex, path, breaker, f"{e.status_code}")
+            else:
+                breaker.success()
+            if e.status_code == 404:
+                self._remember_404(sex, path, str(e.detail))
+            raise
+        except httpx.TransportError as e:
+            self._breaker_failure(sex, path, breaker, type(e).__name__)
+            raise
+        except BaseException:
+            breaker.abandon()
+            raise
+        breaker.success()
+        return raw
+
+    def _breaker_failure(self, sex: str, path: str, breaker: CircuitBreaker, error: str):
+        was_open = breaker.state == CircuitBreaker.OPEN
+        breaker.failure(error)
+        if breaker.state == CircuitBreaker.OPEN and not was_open:
+            dprint("Circuit open:", sex, path_template(path), error, "for", breaker.open_ms, "ms")
+            METRICS.inc("lnp_upstream_breaker_opened_total", {"path": path_template(path), "sex": sex})
+
+    def _remember_404(self, sex: str, path: str, detail: str):
+        t = now_ms()
+        if len(self._negative) >= CACHE_MAX_ENTRIES:
+            self._negative = {k: v for k, v in self._negative.items() if v[0] > t}
+            while len(self._negative) >= CACHE_MAX_ENTRIES:
+                del self._negative[next(iter(self._negative))]
+        self._negative[(sex, path)] = (t + NEGATIVE_TTL_MS, detail)
+
+    def breaker_stats(self) -> Dict[str, Any]:
+        return {
+            "negative_entries": len(self._negative),
+            "negative_hits": self.negative_hits,
+            "served_stale": self.breaker_stale,
+            "paths": {
+                f"{sex} {tpl}": b.stats() for (sex, tpl), b in self._breakers.items() if b.state != b.CLOSED or b.opened
+            },
+        }
+
+    def singleflight_stats(self) -> Dict[str, Any]:
+        return {
+            "upstream_requests": self.upstream_requests,
+            "deduplicated": self.deduplicated,
+            "inflight": len(self._inflight),
+        }
+
+    async def _get(
+        self, url: str, st: TokenState, priority: int, extra_headers: Optional[Dict[str, str]] = None
+    ) -> httpx.Response:
+        with timed("queue"):
+            await self.limiter.acquire(priority)
+        t0 = time.monotonic()
+        tpl = path_template(url[len(BASE_API):])
+        try:
+            with timed("upstream"):
+                r = await self.client.get(url, headers={**self._auth_headers(st), **(extra_headers or {})})
+        except httpx.TransportError:
+            self.limiter.feedback(599, (time.monotonic() - t0) * 1000)
+            METRICS.observe("lnp_upstream_request_duration_seconds", time.monotonic() - t0, {"path": tpl, "status": "error"})
+            raise
+        finally:
+            self.limiter.release()
+        took = time.monotonic() - t0
+        self.limiter.feedback(r.status_code, took * 1000)
+        METRICS.observe("lnp_upstream_request_duration_seconds", took, {"path": tpl, "status": str(r.status_code)})
+        return r
+
+    def pool_stats(self) -> Dict[str, int]:
+        """httpx/httpcore pool occupancy (relies on httpcore internals, best effort)."""
+        out = {"active": 0, "idle": 0, "max": UPSTREAM_MAX_CONCURRENCY}
+        try:
+            pool = self.client._transport._pool  # type: ignore[union-attr]
+            for c in pool.connections:
+                out["idle" if c.is_idle() else "active"] += 1
+        except Exception:
+            pass
+        return out
+
+    async def _request_raw(self, sex: str, path: str, priority: int = PRIORITY_INTERACTIVE) -> bytes:
         if not self.client:
             raise RuntimeError("ApiClient not started")
 
         try:
-            await self.ensure_token(sex)
+            with timed("token"):
+                await self.ensure_token(sex)
         except RuntimeError as e:
             raise HTTPException(status_code=503, detail=str(e))
 
@@ -313,21 +1941,42 @@ class ApiClient:
             "token_src=", self.tp.state(sex).token_src
         )
 
-        r = await self.client.get(url, headers=self._auth_headers(sex))
+        # conditional request when we still hold the body the validators belong to
+        ttl = cache_ttl_for(path)
+        prev = self.cache.peek(sex, path) if ttl > 0 else None
+        cond: Dict[str, str] = {}
+        if prev and prev.etag:
+            cond["if-none-match"] = prev.etag
+        if prev and prev.last_modified:
+            cond["if-modified-since"] = prev.last_modified
+
+        used = self.tp.next_state(sex)
+        r = await self._get(url, used, priority, cond)
         if r.status_code == 401:
             dprint("401 for", path, "-> refresh + retry")
+            METRICS.inc("lnp_upstream_401_total", {"sex": sex})
             try:
-                await self.tp.refresh(sex)
+                with timed("token"):
+                    st = await self.tp.refresh(sex, stale_token=used.token)
             except RuntimeError as e:
                 raise HTTPException(status_code=503, detail=str(e))
-            r = await self.client.get(url, headers=self._auth_headers(sex))
+            r = await self._get(url, st, priority, cond)
+
+        if r.status_code == 304 and prev:
+            self.cache.not_modified += 1
+            self.cache.put(sex, path, prev.raw, ttl, prev.etag, prev.last_modified, prev._value)
+            return prev.raw
 
         if r.status_code >= 400:
             body = (r.text or "").strip()
             raise HTTPException(status_code=r.status_code, detail=body or "error")
 
-        txt = (r.text or "").strip()
-        return r.json() if txt else None
+        raw = r.content.strip()
+        if LNP_RECORD_DIR and raw:
+            record_payload(path, raw)
+        if ttl > 0:
+            self.cache.put(sex, path, raw, ttl, r.headers.get("etag", ""), r.headers.get("last-modified", ""))
+        return raw
 
 
 def normalize_seasons(data: Any) -> List[Dict[str, Any]]:
@@ -410,47 +2059,71 @@ def normalize_play_dictionaries(data: Any) -> List[Dict[str, Any]]:
     return out
 
 
-def extract_teams(payload: Any) -> List[Dict[str, Any]]:
-    teams: List[Dict[str, Any]] = []
+class _TeamHit:
+    __slots__ = ("team", "team_id", "points")
+
+    def __init__(self, team: str, team_id: str, points: Any):
+        self.team = team
+        self.team_id = team_id
+        self.points = points
 
-    def add_team(tid: Any, name: Any, points: Any = None):
-        if not is_uuid(tid):
-            return
-        if not isinstance(name, str) or not name.strip():
-            return
-        teams.append({"team": name.strip(), "team_id": tid, "points": points})
 
-    def scan(obj: Any):
-        if isinstance(obj, dict):
-            tid = obj.get("teamId") or obj.get("team_id")
-            tname = obj.get("teamName") or obj.get("team_name")
-            pts = obj.get("points") or obj.get("pts")
-            if tid and tname:
-                add_team(tid, tname, pts)
+_TEAM_SUB_KEYS = ("team", "club", "teamDto", "clubDto")
+# a dict with none of these keys cannot carry a team row
+_TEAM_ANY_KEYS = frozenset(("teamId", "team_id") + _TEAM_SUB_KEYS)
 
-            for key in ("team", "club", "teamDto", "clubDto"):
-                sub = obj.get(key)
-                if isinstance(sub, dict):
-                    stid = sub.get("id") or sub.get("teamId") or sub.get("clubId")
-                    sname = sub.get("name") or sub.get("teamName") or sub.get("clubName") or sub.get("shortName")
-                    add_team(stid, sname, obj.get("points") or obj.get("pts"))
 
-            for v in obj.values():
-                scan(v)
+def _add_team_hit(hits: List[_TeamHit], tid: Any, name: Any, points: Any):
+    if is_uuid(tid) and isinstance(name, str) and name.strip():
+        hits.append(_TeamHit(name.strip(), tid, points))
 
-        elif isinstance(obj, list):
-            for it in obj:
-                scan(it)
 
-    scan(payload)
+def _team_hits(obj: Dict[str, Any], hits: List[_TeamHit]):
+    """Team rows carried by one dict: its own teamId/teamName, then team-like sub-objects."""
+    tid = obj.get("teamId") or obj.get("team_id")
+    tname = obj.get("teamName") or obj.get("team_name")
+    if tid and tname:
+        _add_team_hit(hits, tid, tname, obj.get("points") or obj.get("pts"))
+    for key in _TEAM_SUB_KEYS:
+        sub = obj.get(key)
+        if isinstance(sub, dict):
+            stid = sub.get("id") or sub.get("teamId") or sub.get("clubId")
+            sname = sub.get("name") or sub.get("teamName") or sub.get("clubName") or sub.get("shortName")
+            _add_team_hit(hits, stid, sname, obj.get("points") or obj.get("pts"))
+
+
+def extract_teams(payload: Any) -> List[Dict[str, Any]]:
+    """
+    Team rows ({team, team_id, points}, table order, first occurrence per team) found
+    anywhere in a tables payload. Pre-order scan of every dict and list, iterative so
+    deep payloads cannot hit the recursion limit.
+    """
+    hits: List[_TeamHit] = []
+    stack: List[Any] = [payload] if type(payload) in (dict, list) else []
+    pop, push = stack.pop, stack.append
+    while stack:
+        obj = pop()
+        # children pushed last-first, so they are visited in document order
+        if type(obj) is dict:
+            if not _TEAM_ANY_KEYS.isdisjoint(obj):
+                _team_hits(obj, hits)
+            for v in reversed(obj.values()):
+                t = type(v)
+                if t is dict or t is list:
+                    push(v)
+        else:
+            for v in reversed(obj):
+                t = type(v)
+                if t is dict or t is list:
+                    push(v)
 
     seen = set()
     uniq = []
-    for t in teams:
-        if t["team_id"] in seen:
+    for h in hits:
+        if h.team_id in seen:
             continue
-        seen.add(t["team_id"])
-        uniq.append(t)
+        seen.add(h.team_id)
+        uniq.append({"team": h.team, "team_id": h.team_id, "points": h.points})
     return uniq
 
 
@@ -478,16 +2151,766 @@ def normalize_players(data: Any) -> List[Dict[str, Any]]:
                 "number": it.get("number") or it.get("shirtNumber"),
                 "position": it.get("position") or it.get("pos"),
                 "club": it.get("clubName") or it.get("teamName") or None,
+                "birth_date": it.get("birthDate") or it.get("dateOfBirth") or it.get("birthYear") or None,
+            }
+        )
+    return out
+
+
+class EntityStore:
+    """
+    SQLite store of normalized entities (seasons, leagues, plays, teams, players).
+    One row per (kind, sex, key) where key is the parent UUID(s) of the endpoint.
+    Survives restarts, so the service answers warm right after a deploy.
+    Also keeps a content hash per resource (incl. player stats) and appends to
+    the `changes` log whenever the normalized form differs from the last one seen.
+    Reads go through an in-memory LRU of the decoded records first; SQLite is
+    what fills it on a cold start.
+    """
+
+    def __init__(self, path: str = LNP_STORE_PATH, mem_entries: int = CACHE_MAX_ENTRIES):
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self._mu = threading.Lock()
+        self._mem: "OrderedDict[Tuple[str, str, str], Tuple[Any, int]]" = OrderedDict()
+        self._mem_entries = mem_entries
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def open(self):
+        if not self.enabled or self._db:
+            return
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entities ("
+            " kind TEXT NOT NULL, sex TEXT NOT NULL, key TEXT NOT NULL,"
+            " data TEXT NOT NULL, updated_at_ms INTEGER NOT NULL,"
+            " PRIMARY KEY (kind, sex, key))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS resource_hashes ("
+            " kind TEXT NOT NULL, sex TEXT NOT NULL, key TEXT NOT NULL,"
+            " hash TEXT NOT NULL, changed_at_ms INTEGER NOT NULL,"
+            " PRIMARY KEY (kind, sex, key))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS changes ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " kind TEXT NOT NULL, sex TEXT NOT NULL, key TEXT NOT NULL,"
+            " hash TEXT NOT NULL, changed_at_ms INTEGER NOT NULL)"
+        )
+        self._db.commit()
+
+    def close(self):
+        with self._mu:
+            if self._db:
+                self._db.close()
+            self._db = None
+
+    def _get(self, kind: str, sex: str, key: str) -> Optional[Tuple[Any, int]]:
+        with self._mu:
+            if not self._db:
+                return None
+            row = self._db.execute(
+                "SELECT data, updated_at_ms FROM entities WHERE kind=? AND sex=? AND key=?",
+                (kind, sex, key),
+            ).fetchone()
+        if not row:
+            return None
+        return json.loads(row[0]), int(row[1])
+
+    def _track_locked(self, kind: str, sex: str, key: str, digest: str) -> bool:
+        row = self._db.execute(
+            "SELECT hash FROM resource_hashes WHERE kind=? AND sex=? AND key=?", (kind, sex, key)
+        ).fetchone()
+        if row and row[0] == digest:
+            return False
+        ts = now_ms()
+        self._db.execute(
+            "INSERT OR REPLACE INTO resource_hashes (kind, sex, key, hash, changed_at_ms) VALUES (?, ?, ?, ?, ?)",
+            (kind, sex, key, digest, ts),
+        )
+        self._db.execute(
+            "INSERT INTO changes (kind, sex, key, hash, changed_at_ms) VALUES (?, ?, ?, ?, ?)",
+            (kind, sex, key, digest, ts),
+        )
+        return True
+
+    def _put(self, kind: str, sex: str, key: str, data: Any):
+        blob = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        with self._mu:
+            if not self._db:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO entities (kind, sex, key, data, updated_at_ms) VALUES (?, ?, ?, ?, ?)",
+                (kind, sex, key, blob, now_ms()),
+            )
+            digest = hashlib.sha1(
+                json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+            ).hexdigest()
+            self._track_locked(kind, sex, key, digest)
+            self._db.commit()
+
+    def _track(self, kind: str, sex: str, key: str, raw: bytes) -> bool:
+        digest = hashlib.sha1(raw).hexdigest()
+        with self._mu:
+            if not self._db:
+                return False
+            changed = self._track_locked(kind, sex, key, digest)
+            self._db.commit()
+            return changed
+
+    def _changes(self, since: int, kinds: List[str], limit: int) -> List[Dict[str, Any]]:
+        sql = "SELECT seq, kind, sex, key, hash, changed_at_ms FROM changes WHERE seq > ?"
+        args: List[Any] = [since]
+        if kinds:
+            sql += " AND kind IN (%s)" % ",".join("?" * len(kinds))
+            args += kinds
+        sql += " ORDER BY seq LIMIT ?"
+        args.append(limit)
+        with self._mu:
+            if not self._db:
+                return []
+            rows = self._db.execute(sql, args).fetchall()
+        return [
+            {"seq": r[0], "kind": r[1], "sex": r[2], "key": r[3], "hash": r[4], "changed_at_ms": r[5]}
+            for r in rows
+        ]
+
+    def _remember(self, mkey: Tuple[str, str, str], rec: Tuple[Any, int]):
+        self._mem[mkey] = rec
+        self._mem.move_to_end(mkey)
+        while len(self._mem) > self._mem_entries:
+            self._mem.popitem(last=False)
+
+    async def get(self, kind: str, sex: str, key: str) -> Optional[Tuple[Any, int]]:
+        """(data, updated_at_ms); the returned data is shared, callers must not mutate it."""
+        if not self.enabled:
+            return None
+        mkey = (kind, sex, key)
+        rec = self._mem.get(mkey)
+        if rec is not None:
+            self._mem.move_to_end(mkey)
+            return rec
+        rec = await asyncio.to_thread(self._get, kind, sex, key)
+        if rec is not None:
+            self._remember(mkey, rec)
+        return rec
+
+    async def put(self, kind: str, sex: str, key: str, data: Any):
+        if not self.enabled:
+            return
+        self._remember((kind, sex, key), (data, now_ms()))
+        await asyncio.to_thread(self._put, kind, sex, key, data)
+
+    async def track(self, kind: str, sex: str, key: str, raw: bytes) -> bool:
+        """Record the content hash of a raw resource that is not stored itself; True if it changed."""
+        if not self.enabled:
+            return False
+        return await asyncio.to_thread(self._track, kind, sex, key, raw)
+
+    async def changes(self, since: int, kinds: List[str], limit: int) -> List[Dict[str, Any]]:
+        if not self.enabled:
+            return []
+        return await asyncio.to_thread(self._changes, since, kinds, limit)
+
+    def _scan(self, kind: str) -> List[Tuple[str, str, Any]]:
+        with self._mu:
+            if not self._db:
+                return []
+            rows = self._db.execute("SELECT sex, key, data FROM entities WHERE kind=?", (kind,)).fetchall()
+        return [(r[0], r[1], json.loads(r[2])) for r in rows]
+
+    async def scan(self, kind: str) -> List[Tuple[str, str, Any]]:
+        """All (sex, key, data) records of a kind."""
+        if not self.enabled:
+            return []
+        return await asyncio.to_thread(self._scan, kind)
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"path": self.path, "enabled": self.enabled}
+        with self._mu:
+            if self._db:
+                out["counts"] = dict(self._db.execute("SELECT kind, COUNT(*) FROM entities GROUP BY kind").fetchall())
+        return out
+
+
+# Polish letters without a Unicode decomposition
+_FOLD_EXTRA = str.maketrans({"ł": "l", "Ł": "l", "ø": "o", "đ": "d", "ß": "ss"})
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def fold(text: str) -> str:
+    """Lowercase, diacritics stripped: 'Łukasz Wiśniewski' -> 'lukasz wisniewski'."""
+    text = unicodedata.normalize("NFKD", text.translate(_FOLD_EXTRA))
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def name_tokens(text: str) -> List[str]:
+    return _WORD_RE.findall(fold(text))
+
+
+def trigrams(token: str, prefix: bool = False) -> Set[str]:
+    """Padded trigrams; prefix=True leaves the end open so 'kow' matches 'kowalski'."""
+    padded = "  " + token + ("" if prefix else " ")
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+_YEAR_RE = re.compile(r"(19|20)\d\d")
+# generic words in Polish club names ("MKS", "Klub Sportowy", "S.A.") that say nothing about the club
+_CLUB_STOPWORDS = {
+    "ks", "mks", "gks", "uks", "luks", "lks", "ts", "fc", "sp", "sa", "ssa", "zoo", "oo", "z",
+    "klub", "sportowy", "pilkarski", "akademia", "pilkarska", "football", "club", "stowarzyszenie",
+}
+
+
+def birth_year(value: Any) -> Optional[int]:
+    m = _YEAR_RE.search(str(value or ""))
+    return int(m.group(0)) if m else None
+
+
+def club_key(club: Any) -> str:
+    """Most distinctive word of a club name: 'MKS Wisła Kraków S.A.' -> 'krakow'."""
+    words = [w for w in name_tokens(str(club or "")) if w not in _CLUB_STOPWORDS and not w.isdigit()]
+    return max(words, key=len) if words else ""
+
+
+@dataclass
+class MatchFeatures:
+    """Folded fields of one person, as compared by PlayerIndex.match()."""
+    first: str
+    last: str
+    year: Optional[int]
+    club: str
+    first_grams: Set[str]
+    last_grams: Set[str]
+
+    @classmethod
+    def of(cls, first: Any, last: Any, birth: Any, club: Any) -> "MatchFeatures":
+        f, l = " ".join(name_tokens(str(first or ""))), " ".join(name_tokens(str(last or "")))
+        return cls(f, l, birth_year(birth), club_key(club), trigrams(f) if f else set(), trigrams(l) if l else set())
+
+    def blocking_keys(self, swapped: bool = False) -> List[str]:
+        """surname word / surname prefix + birth year / club + surname initial."""
+        last = self.first if swapped else self.last
+        keys = []
+        for w in last.split():
+            keys.append("s:" + w)
+            if self.year:
+                keys.append(f"sy:{w[:4]}:{self.year}")
+        if self.club and last:
+            keys.append(f"c:{self.club}:{last[0]}")
+        return keys
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def name_similarity(q: MatchFeatures, c: MatchFeatures) -> Tuple[float, float]:
+    """(surname, first name) similarity; swapped first/last names (a common data entry slip) count too."""
+    straight = (_jaccard(q.last_grams, c.last_grams), _jaccard(q.first_grams, c.first_grams))
+    swapped = (_jaccard(q.first_grams, c.last_grams), _jaccard(q.last_grams, c.first_grams))
+    return max(straight, swapped, key=lambda t: 0.45 * t[0] + 0.25 * t[1])
+
+
+def match_confidence(q: MatchFeatures, c: MatchFeatures, names: Optional[Tuple[float, float]] = None) -> float:
+    """
+    Weighted similarity in [0, 1]: surname .45, first name .25, birth year .2, club .1.
+    Fields missing on either side drop out and the rest is renormalized.
+    `names` is name_similarity(q, c) when the caller already has it.
+    """
+    last_sim, first_sim = names or name_similarity(q, c)
+    total, weight = 0.45 * last_sim, 0.45
+    if q.first and c.first:
+        total += 0.25 * first_sim
+        weight += 0.25
+    if q.year and c.year:
+        d = abs(q.year - c.year)
+        total += 0.2 * (1.0 if d == 0 else 0.5 if d == 1 else 0.0)
+        weight += 0.2
+    if q.club and c.club:
+        total += 0.1 * (1.0 if q.club == c.club else 0.0)
+        weight += 0.1
+    return total / weight
+
+
+class PlayerIndex:
+    """
+    In-memory fuzzy search over every squad player the service has normalized.
+    Two levels, so a query touches the vocabulary rather than every player:
+    trigram -> distinct folded name words, and word -> player docs (int ids).
+    A team's squad is replaced as a whole when re-indexed.
+    """
+
+    def __init__(self):
+        self._docs: Dict[int, Dict[str, Any]] = {}
+        self._doc_by_key: Dict[Tuple[str, str], int] = {}
+        self._team_docs: Dict[Tuple[str, str], Set[int]] = {}
+        self._team_squads: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._word_docs: Dict[str, Set[int]] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        self._words: Dict[int, List[str]] = {}
+        # facets: doc -> raw value for counting, ("sex"|"club"|"position", folded value) -> docs for filtering
+        self._doc_club: Dict[int, str] = {}
+        self._doc_position: Dict[int, str] = {}
+        self._facet_docs: Dict[Tuple[str, str], Set[int]] = {}
+        # entity matching: blocking key -> docs, doc -> comparable features
+        self._feats: Dict[int, MatchFeatures] = {}
+        self._block_docs: Dict[str, Set[int]] = {}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _facets(self, doc: Dict[str, Any]) -> List[Tuple[str, str]]:
+        return [
+            ("sex", doc["sex"]),
+            ("club", fold(doc.get("club") or "")),
+            ("position", fold(str(doc.get("position") or ""))),
+        ]
+
+    def _unlink(self, doc_id: int):
+        doc = self._docs.pop(doc_id)
+        self._doc_by_key.pop((doc["sex"], doc["key"]), None)
+        self._doc_club.pop(doc_id, None)
+        self._doc_position.pop(doc_id, None)
+        for f in self._facets(doc):
+            docs = self._facet_docs.get(f)
+            if docs is not None:
+                docs.discard(doc_id)
+                if not docs:
+                    del self._facet_docs[f]
+        feats = self._feats.pop(doc_id, None)
+        for k in feats.blocking_keys() if feats else ():
+            docs = self._block_docs.get(k)
+            if docs is not None:
+                docs.discard(doc_id)
+                if not docs:
+                    del self._block_docs[k]
+        for w in self._words.pop(doc_id, ()):
+            docs = self._word_docs.get(w)
+            if docs is None:
+                continue
+            docs.discard(doc_id)
+            if docs:
+                continue
+            del self._word_docs[w]
+            for g in trigrams(w):
+                posting = self._grams[g]
+                posting.discard(w)
+                if not posting:
+                    del self._grams[g]
+
+    def add_team(self, sex: str, team_id: str, squad: List[Dict[str, Any]]):
+        tkey = (sex, team_id)
+        if self._team_squads.get(tkey) == squad:
+            return
+        for doc_id in self._team_docs.pop(tkey, set()):
+            if doc_id in self._docs:
+                self._unlink(doc_id)
+        self._team_squads[tkey] = squad
+
+        ids: Set[int] = set()
+        for p in squad:
+            full = p.get("name") or f"{p.get('firstname') or ''} {p.get('lastname') or ''}"
+            words = name_tokens(full)
+            if not words:
+                continue
+            key = p.get("player_id") or f"{team_id}:{' '.join(words)}"
+            # a player seen in another squad (transfer) keeps only the latest one
+            prev = self._doc_by_key.get((sex, key))
+            if prev is not None:
+                self._unlink(prev)
+            doc_id = self._next_id
+            self._next_id += 1
+            doc = self._docs[doc_id] = {**p, "team_id": team_id, "sex": sex, "key": key}
+            self._doc_by_key[(sex, key)] = doc_id
+            self._doc_club[doc_id] = doc.get("club") or ""
+            self._doc_position[doc_id] = str(doc.get("position") or "")
+            for f in self._facets(doc):
+                self._facet_docs.setdefault(f, set()).add(doc_id)
+            if p.get("lastname") or p.get("firstname"):
+                feats = MatchFeatures.of(p.get("firstname"), p.get("lastname"), p.get("birth_date"), p.get("club"))
+            else:
+                feats = MatchFeatures.of(" ".join(words[:-1]), words[-1], p.get("birth_date"), p.get("club"))
+            self._feats[doc_id] = feats
+            for k in feats.blocking_keys():
+                self._block_docs.setdefault(k, set()).add(doc_id)
+            self._words[doc_id] = words
+            for w in words:
+                docs = self._word_docs.get(w)
+                if docs is None:
+                    docs = self._word_docs[w] = set()
+                    for g in trigrams(w):
+                        self._grams.setdefault(g, set()).add(w)
+                docs.add(doc_id)
+            ids.add(doc_id)
+        self._team_docs[tkey] = ids
+
+    def _match_words(self, w: str, min_similarity: float) -> List[Tuple[float, str]]:
+        """Vocabulary words sharing enough of w's prefix trigrams, best first (+1 for a prefix hit)."""
+        grams = trigrams(w, prefix=True)
+        hits: Counter = Counter()
+        for g in grams:
+            posting = self._grams.get(g)
+            if posting:
+                hits.update(posting)
+        need = len(grams) * min_similarity
+        out = [
+            (n / len(grams) + (1.0 if word.startswith(w) else 0.0), word)
+            for word, n in hits.items()
+            if n >= need
+        ]
+        out.sort(reverse=True)
+        return out
+
+    def search(
+        self,
+        q: str,
+        sex: Optional[str] = None,
+        club: Optional[str] = None,
+        position: Optional[str] = None,
+        limit: int = 20,
+        min_similarity: float = 0.5,
+    ) -> Dict[str, Any]:
+        """
+        Every query word must match some name word of a player with at least
+        `min_similarity` of its (prefix) trigrams; score sums the best match per
+        query word, exact/prefix word hits rank first.
+        """
+        scores: Dict[int, float] = {}
+        for i, w in enumerate(name_tokens(q)):
+            # best words first, so each doc keeps its highest similarity (set ops, no per-doc loop)
+            best: Dict[int, float] = {}
+            for sim, word in self._match_words(w, min_similarity):
+                best.update(dict.fromkeys(self._word_docs[word].difference(best), sim))
+            if i == 0:
+                scores = best
+            else:
+                scores = {d: scores[d] + best[d] for d in scores.keys() & best.keys()}
+            if not scores:
+                break
+
+        hits = scores.keys()
+        for facet, value in (("sex", sex), ("club", club), ("position", position)):
+            if value:
+                hits = hits & self._facet_docs.get((facet, fold(value) if facet != "sex" else value), set())
+
+        # counted over the whole hit set, not just the returned page
+        clubs = Counter(map(self._doc_club.__getitem__, hits))
+        positions = Counter(map(self._doc_position.__getitem__, hits))
+        clubs.pop("", None)
+        positions.pop("", None)
+
+        results = []
+        for doc_id in heapq.nlargest(limit, hits, key=scores.__getitem__):
+            doc = {k: v for k, v in self._docs[doc_id].items() if k != "key"}
+            doc["score"] = round(scores[doc_id], 3)
+            results.append(doc)
+        return {
+            "total": len(hits),
+            "results": results,
+            "facets": {"club": dict(clubs.most_common(10)), "position": dict(positions.most_common(10))},
+        }
+
+    def candidates(self, q: MatchFeatures) -> Set[int]:
+        """
+        Union of the record's narrow blocks (surname prefix + year, club); the bare
+        surname block only when those are empty. Oversized blocks count only when
+        nothing smaller exists.
+        """
+        keys = set(q.blocking_keys() + q.blocking_keys(swapped=True))
+        for narrow in (True, False):
+            blocks = [
+                self._block_docs[k] for k in keys if k in self._block_docs and (k[0] != "s" or k[1] == "y") == narrow
+            ]
+            small = [b for b in blocks if len(b) <= MATCH_MAX_BLOCK]
+            if small:
+                return set().union(*small)
+            if blocks and not narrow:
+                return set(min(blocks, key=len))
+        return set()
+
+    def match(
+        self, q: MatchFeatures, sex: Optional[str] = None, limit: int = 3, min_confidence: float = 0.5
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Ranked LNP players for one record, plus how many candidates were scored."""
+        cands = self.candidates(q)
+        if sex:
+            cands &= self._facet_docs.get(("sex", sex), set())
+        scored = []
+        # players in one block mostly share names: compare each distinct name once
+        names: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        for doc_id in cands:
+            c = self._feats[doc_id]
+            nk = (c.last, c.first)
+            ns = names.get(nk)
+            if ns is None:
+                ns = names[nk] = name_similarity(q, c)
+            conf = match_confidence(q, c, ns)
+            if conf >= min_confidence:
+                scored.append((conf, doc_id))
+        out = []
+        for conf, doc_id in heapq.nlargest(limit, scored):
+            doc = {k: v for k, v in self._docs[doc_id].items() if k != "key"}
+            doc["confidence"] = round(conf, 3)
+            out.append(doc)
+        return out, len(cands)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "players": len(self._docs),
+            "teams": len(self._team_docs),
+            "words": len(self._word_docs),
+            "trigrams": len(self._grams),
+            "blocks": len(self._block_docs),
+        }
+
+
+_MINUTES_KEYS = ("minutes", "minutesplayed", "playedminutes", "timeplayed", "minutesonpitch")
+_MATCHES_KEYS = ("matches", "games", "appearances", "matchesplayed", "gamesplayed")
+# already a rate: not divided by minutes
+_RATE_HINTS = ("percent", "ratio", "rate", "avg", "average", "rating", "per90", "accuracy")
+_POSITION_GROUPS = (
+    ("GK", ("gk", "goalkeeper", "bramk")),
+    ("DF", ("df", "def", "obr", "stoper", "cb", "lb", "rb")),
+    ("MF", ("mf", "mid", "pom", "skrzyd", "cm", "dm", "am")),
+    ("FW", ("fw", "att", "forward", "nap", "striker", "st", "cf")),
+)
+
+
+def flatten_stats(data: Any, prefix: str = "", out: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """
+    Numeric leaves of a stats payload as {"dotted.path": value}. Lists of rows
+    (e.g. one per competition or match) are summed path by path.
+    """
+    if out is None:
+        out = {}
+    if isinstance(data, dict):
+        for k, v in data.items():
+            flatten_stats(v, f"{prefix}.{k}" if prefix else str(k), out)
+    elif isinstance(data, list):
+        for it in data:
+            flatten_stats(it, prefix, out)
+    elif isinstance(data, (int, float)) and not isinstance(data, bool) and prefix:
+        out[prefix] = out.get(prefix, 0.0) + float(data)
+    return out
+
+
+def position_group(position: Any) -> str:
+    words = name_tokens(str(position or ""))
+    for group, hints in _POSITION_GROUPS:
+        # short codes match whole words ("st"), longer hints prefixes ("obr" -> "obronca")
+        if any(w in hints or any(len(h) >= 3 and w.startswith(h) for h in hints) for w in words):
+            return group
+    return "?"
+
+
+def _stat_leaf(col: str) -> str:
+    return col.rsplit(".", 1)[-1].lower()
+
+
+def league_frame(players: List[Dict[str, Any]], stats: List[Dict[str, float]], min_minutes: int) -> Dict[str, Any]:
+    """
+    One columnar pass over a league: players x metrics matrix, per-90 rates for
+    counting stats, percentiles within the league and z-scores within position
+    groups. Missing values stay NaN and are left out of every statistic.
+    """
+    cols = sorted({c for st in stats for c in st})
+    col_ix = {c: j for j, c in enumerate(cols)}
+    raw = np.full((len(players), len(cols)), np.nan)
+    for i, st in enumerate(stats):
+        for c, v in st.items():
+            raw[i, col_ix[c]] = v
+
+    leaves = [_stat_leaf(c) for c in cols]
+    minutes_j = next((j for j, l in enumerate(leaves) if l in _MINUTES_KEYS), None)
+    minutes = raw[:, minutes_j] if minutes_j is not None else np.full(len(players), np.nan)
+    counting = np.array(
+        [l not in _MINUTES_KEYS and l not in _MATCHES_KEYS and not any(h in l for h in _RATE_HINTS) for l in leaves],
+        dtype=bool,
+    )
+
+    # metric = per-90 rate for counting stats (NaN under min_minutes), raw value otherwise
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per90 = raw * (90.0 / np.where(minutes >= max(1, min_minutes), minutes, np.nan))[:, None]
+    metric = np.where(counting[None, :], per90, raw)
+
+    # percentile = share of valid league values below, ties counted half
+    valid = ~np.isnan(metric)
+    n_valid = valid.sum(axis=0)
+    ordered = np.sort(metric, axis=0)  # NaNs last
+    pct = np.full(metric.shape, np.nan)
+    for j in range(len(cols)):
+        if n_valid[j]:
+            col = ordered[: n_valid[j], j]
+            lo = np.searchsorted(col, metric[:, j], side="left")
+            hi = np.searchsorted(col, metric[:, j], side="right")
+            pct[:, j] = (lo + hi) / 2 / n_valid[j] * 100
+    pct[~valid] = np.nan
+
+    groups = np.array([position_group(p.get("position")) for p in players])
+    z = np.full(metric.shape, np.nan)
+    for g in np.unique(groups):
+        rows = groups == g
+        with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns within a group
+            mean = np.nanmean(metric[rows], axis=0)
+            std = np.nanstd(metric[rows], axis=0)
+            z[rows] = (metric[rows] - mean) / np.where(std > 0, std, np.nan)
+
+    return {
+        "columns": cols,
+        "counting": counting,
+        "players": players,
+        "groups": groups,
+        "minutes": minutes,
+        "raw": raw,
+        "metric": metric,
+        "percentile": pct,
+        "z": z,
+    }
+
+
+def _json_floats(a: Any, digits: int) -> List[Any]:
+    """Rounded floats with NaN -> None, row by row."""
+    return np.where(np.isnan(a), None, np.round(a, digits)).tolist()
+
+
+def league_frame_rows(frame: Dict[str, Any], only: Optional[Set[int]] = None) -> List[Dict[str, Any]]:
+    cols = frame["columns"]
+    idx = sorted(only) if only is not None else range(len(frame["players"]))
+    idx = list(idx)
+    raw, metric = _json_floats(frame["raw"][idx], 3), _json_floats(frame["metric"][idx], 3)
+    pct, z = _json_floats(frame["percentile"][idx], 1), _json_floats(frame["z"][idx], 2)
+    minutes = _json_floats(frame["minutes"][idx], 0)
+    out = []
+    for k, i in enumerate(idx):
+        p = frame["players"][i]
+        out.append(
+            {
+                **p,
+                "group": str(frame["groups"][i]),
+                "minutes": minutes[k],
+                "stats": {c: v for c, v in zip(cols, raw[k]) if v is not None},
+                "metric": {c: v for c, v in zip(cols, metric[k]) if v is not None},
+                "percentile": {c: v for c, v in zip(cols, pct[k]) if v is not None},
+                "z": {c: v for c, v in zip(cols, z[k]) if v is not None},
             }
         )
     return out
 
 
 # ---------- FastAPI ----------
-app = FastAPI(title="LNP Scraper Service")
+class FastJSONResponse(JSONResponse):
+    """orjson when installed; endpoints with big payloads return it directly to skip jsonable_encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = {t.strip() for t in if_none_match.split(",")}
+    # If-None-Match compares weakly
+    return "*" in tags or etag in tags or "W/" + etag in tags
+
+
+def validated_json(request: Request, content: Any, max_age_s: int) -> Response:
+    """
+    Normalized payload with a strong ETag (hash of the body) and Cache-Control;
+    a matching If-None-Match gets an empty 304 instead.
+    """
+    body = json_dumps(content)
+    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+    headers = {"etag": etag, "cache-control": f"private, max-age={max_age_s}, must-revalidate"}
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+class CompressionMiddleware:
+    """gzip negotiated via Accept-Encoding, except incremental streams (would delay first rows)."""
+
+    def __init__(self, app, minimum_size: int = GZIP_MIN_BYTES):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope.get("path", "").endswith("/stream"):
+            await self.app(scope, receive, send)
+            return
+        await self.gzip(scope, receive, send)
+
+
+app = FastAPI(title="LNP Scraper Service", default_response_class=FastJSONResponse)
+app.add_middleware(CompressionMiddleware)
+
+if LNP_TOKEN_SOURCE == "static":
+    tp: TokenProvider = StaticTokenProvider()
+elif LNP_TOKEN_SOURCE == "broker":
+    tp = BrokerTokenProvider()
+else:
+    tp = TokenProvider()
+refresher = TokenRefresher(tp)
+api = ApiClient(tp, refresher)
+store = EntityStore()
+player_index = PlayerIndex()
+_store_refreshing: Set[Tuple[str, str, str]] = set()
+
+
+async def _load_and_store(kind: str, sex: str, key: str, loader) -> Any:
+    data = await loader()
+    if data:
+        await store.put(kind, sex, key, data)
+        if kind == "players":
+            player_index.add_team(sex, key, data)
+    return data
+
+
+async def _index_stored_players():
+    """Fill the search index with every squad already in the store."""
+    t0 = time.perf_counter()
+    for i, (sex, team_id, squad) in enumerate(await store.scan("players")):
+        player_index.add_team(sex, team_id, squad)
+        if i % 200 == 199:
+            await asyncio.sleep(0)  # keep serving while a big store is indexed
+    dprint(f"Indexed {len(player_index)} stored players in {time.perf_counter() - t0:.2f}s")
 
-tp = TokenProvider()
-api = ApiClient(tp)
+
+async def stored(kind: str, sex: str, key: str, path: str, loader) -> Any:
+    """
+    Serve normalized data from the store (memory, then SQLite); refresh it lazily
+    once older than the cache TTL of the upstream `path` it is built from (at most
+    STORE_REFRESH_MS). A TTL of 0 turns store reads off for that path, as it does
+    the response cache.
+    `loader` is a zero-arg coroutine function fetching + normalizing from upstream.
+    """
+    refresh_ms = min(cache_ttl_for(path), STORE_REFRESH_MS)
+    if refresh_ms <= 0:
+        return await _load_and_store(kind, sex, key, loader)
+    rec = await store.get(kind, sex, key)
+    if rec is None:
+        return await _load_and_store(kind, sex, key, loader)
+
+    data, updated_at_ms = rec
+    skey = (kind, sex, key)
+    if now_ms() - updated_at_ms > refresh_ms and skey not in _store_refreshing:
+        async def run():
+            try:
+                await _load_and_store(kind, sex, key, loader)
+            except Exception as e:
+                dprint("Store refresh failed for", skey, repr(e))
+            finally:
+                _store_refreshing.discard(skey)
+
+        _store_refreshing.add(skey)
+        spawn_bg(run())
+    return data
 
 
 @app.exception_handler(RuntimeError)
@@ -495,16 +2918,44 @@ async def runtime_error_handler(_: Request, exc: RuntimeError):
     return JSONResponse(status_code=503, content={"detail": str(exc)})
 
 
+@app.middleware("http")
+async def _timing_middleware(request: Request, call_next):
+    timing: Dict[str, float] = {}
+    ctx_token = _req_timing.set(timing)
+    t0 = time.perf_counter()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+    finally:
+        _req_timing.reset(ctx_token)
+        route = request.scope.get("route")
+        METRICS.observe(
+            "lnp_http_request_duration_seconds",
+            time.perf_counter() - t0,
+            {"route": getattr(route, "path", "unmatched"), "method": request.method, "status": status},
+        )
+    timing["total"] = (time.perf_counter() - t0) * 1000
+    response.headers["server-timing"] = ", ".join(f"{k};dur={v:.1f}" for k, v in timing.items())
+    return response
+
+
 @app.on_event("startup")
 async def _startup():
+    store.open()
+    spawn_bg(_index_stored_players())
     await tp.start()
     await api.start()
 
 
 @app.on_event("shutdown")
 async def _shutdown():
+    await refresher.stop()
+    await table_poller.stop()
+    await cancel_bg_tasks()
     await api.stop()
     await tp.stop()
+    store.close()
 
 
 @app.get("/health")
@@ -512,31 +2963,82 @@ async def health():
     return {
         "ok": True,
         "headless": HEADLESS,
+        "token_source": LNP_TOKEN_SOURCE,
         "interactive": LNP_INTERACTIVE,
         "debug": DEBUG,
         "token_ttl_ms": TOKEN_TTL_MS,
+        "token_refresh_ahead": TOKEN_REFRESH_AHEAD,
+        "token_refresh_idle_ms": TOKEN_REFRESH_IDLE_MS,
+        "tokens": tp.token_stats(),
         "capture_wait_ms": CAPTURE_WAIT_MS,
         "capture_retries": CAPTURE_RETRIES,
+        "token_pool_size": TOKEN_POOL_SIZE,
+        "browser_running": tp.browser_running(),
+        "browser": tp.lifecycle.stats(),
+        "capture_lightweight": CAPTURE_LIGHTWEIGHT,
         "profile_dir": LNP_USER_DATA_DIR,
+        "cache": api.cache.stats(),
+        "singleflight": api.singleflight_stats(),
+        "limiter": api.limiter.stats(),
+        "breakers": api.breaker_stats(),
+        "store": store.stats(),
+        "search_index": player_index.stats(),
+        "live_tables": table_poller.stats(),
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    gauges: List[Tuple[str, Dict[str, str], float]] = []
+    for sex in ("Male", "Female"):
+        st = tp.state(sex)
+        if st.token:
+            gauges.append(("lnp_token_age_seconds", {"sex": sex}, (now_ms() - st.token_at_ms) / 1000))
+            gauges.append(("lnp_token_expires_in_seconds", {"sex": sex}, st.expires_in_ms() / 1000))
+    for state, n in api.pool_stats().items():
+        gauges.append(("lnp_httpx_pool_connections", {"state": state}, n))
+    lim = api.limiter.stats()
+    for k in ("limit", "in_flight", "waiting"):
+        gauges.append(("lnp_upstream_concurrency", {"kind": k}, lim[k]))
+    lc = tp.lifecycle
+    if lc.rss_bytes is not None:
+        gauges.append(("lnp_browser_rss_bytes", {}, lc.rss_bytes))
+    if lc.profile_bytes:
+        gauges.append(("lnp_browser_profile_bytes", {"part": "total"}, lc.profile_bytes))
+        gauges.append(("lnp_browser_profile_bytes", {"part": "cache"}, lc.cache_bytes))
+    for (sex, tpl), b in api._breakers.items():
+        gauges.append(("lnp_upstream_breaker_open", {"path": tpl, "sex": sex}, 0 if b.state == b.CLOSED else 1))
+    return PlainTextResponse(METRICS.render(gauges), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/seasons")
-async def seasons(sex: str = Query("Male", pattern="^(Male|Female)$")):
-    data = await api.get_json(sex, "/seasons/dictionaries")
-    return normalize_seasons(data)
+async def seasons(request: Request, sex: str = Query("Male", pattern="^(Male|Female)$")):
+    async def load():
+        data = await api.get_json(sex, "/seasons/dictionaries")
+        with timed("normalize"):
+            return normalize_seasons(data)
+
+    return validated_json(request, await stored("seasons", sex, "", "/seasons/dictionaries", load), CLIENT_MAX_AGE_LONG_S)
 
 
 @app.get("/leagues")
-async def leagues(sex: str = Query("Male", pattern="^(Male|Female)$"), seasonId: str = ""):
+async def leagues(request: Request, sex: str = Query("Male", pattern="^(Male|Female)$"), seasonId: str = ""):
     if not is_uuid(seasonId):
         raise HTTPException(status_code=400, detail="Invalid seasonId")
-    data = await api.get_json(sex, f"/leagues/seasons/{seasonId}/sexes/{sex}/league-groups")
-    return normalize_league_groups(data)
+
+    path = f"/leagues/seasons/{seasonId}/sexes/{sex}/league-groups"
+
+    async def load():
+        data = await api.get_json(sex, path)
+        with timed("normalize"):
+            return normalize_league_groups(data)
+
+    return validated_json(request, await stored("leagues", sex, seasonId, path, load), CLIENT_MAX_AGE_LONG_S)
 
 
 @app.get("/plays")
 async def plays(
+    request: Request,
     sex: str = Query("Male", pattern="^(Male|Female)$"),
     seasonId: str = "",
     leagueId: str = "",
@@ -545,19 +3047,93 @@ async def plays(
         raise HTTPException(status_code=400, detail="Invalid seasonId")
     if not is_uuid(leagueId):
         raise HTTPException(status_code=400, detail="Invalid leagueId")
-    data = await api.get_json(sex, f"/leagues/{leagueId}/seasons/{seasonId}/play-dictionaries")
-    return normalize_play_dictionaries(data)
+    return validated_json(request, await _league_plays(sex, seasonId, leagueId), CLIENT_MAX_AGE_LONG_S)
+
+
+async def _league_plays(
+    sex: str, season_id: str, league_id: str, priority: int = PRIORITY_INTERACTIVE
+) -> List[Dict[str, Any]]:
+    path = f"/leagues/{league_id}/seasons/{season_id}/play-dictionaries"
+
+    async def load():
+        data = await api.get_json(sex, path, priority)
+        with timed("normalize"):
+            return normalize_play_dictionaries(data)
 
+    return await stored("plays", sex, f"{league_id}:{season_id}", path, load)
 
-async def _teams_autodiscovery(sex: str, play_id: str) -> List[Dict[str, Any]]:
-    payload = await api.get_json(sex, f"/plays/{play_id}/tables")
-    teams = extract_teams(payload)
+
+# (sex, play_id) -> queue id whose table had the teams
+_teams_queue_memo: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+# (sex, play_id) -> ms until which the play is known to have no discoverable table
+_teams_negative: Dict[Tuple[str, str], int] = {}
+
+
+async def _probe_queues(
+    sex: str, play_id: str, qids: List[str], priority: int, max_age_ms: Optional[int] = None
+) -> Tuple[Optional[Tuple[str, List[Dict[str, Any]]]], bool]:
+    """
+    Fetch all candidate queue tables at once; first non-empty wins, the rest are cancelled.
+    Failed probes are skipped; the flag says whether every probe got an answer.
+    """
+
+    async def probe(qid: str) -> Tuple[str, List[Dict[str, Any]]]:
+        path = f"/plays/{play_id}/tables?queue={qid}"
+        payload = await api.get_json(sex, path, priority, max_age_ms)
+        with timed("normalize"):
+            return qid, extract_teams(payload)
+
+    tasks = [asyncio.create_task(probe(qid)) for qid in qids]
+    complete = True
+    try:
+        for fut in asyncio.as_completed(tasks):
+            try:
+                qid, teams = await fut
+            except Exception as e:
+                dprint("Queue table probe failed:", play_id, repr(e))
+                complete = False
+                continue
+            if teams:
+                return (qid, teams), complete
+        return None, complete
+    finally:
+        for t in tasks:
+            t.cancel()
+
+
+async def _teams_autodiscovery(
+    sex: str, play_id: str, priority: int = PRIORITY_INTERACTIVE, max_age_ms: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    key = (sex, play_id)
+    if _teams_negative.get(key, 0) > now_ms():
+        raise HTTPException(status_code=404, detail="Cannot discover teams table for this play")
+
+    # queue that worked last time goes first
+    qid = _teams_queue_memo.get(key)
+    if qid:
+        path = f"/plays/{play_id}/tables?queue={qid}"
+        try:
+            payload = await api.get_json(sex, path, priority, max_age_ms)
+            with timed("normalize"):
+                teams = extract_teams(payload)
+        except Exception as e:
+            dprint("Remembered queue table failed:", play_id, qid, repr(e))
+            teams = []
+        if teams:
+            return teams
+        _teams_queue_memo.pop(key, None)
+
+    path = f"/plays/{play_id}/tables"
+    payload = await api.get_json(sex, path, priority, max_age_ms)
+    with timed("normalize"):
+        teams = extract_teams(payload)
     if teams:
         return teams
 
     # fallback: try queues
+    complete = False
     try:
-        q = await api.get_json(sex, f"/plays/{play_id}/queues")
+        q = await api.get_json(sex, f"/plays/{play_id}/queues", priority)
         qids: List[str] = []
 
         def scan(x):
@@ -572,19 +3148,25 @@ async def _teams_autodiscovery(sex: str, play_id: str) -> List[Dict[str, Any]]:
 
         scan(q)
         qids = list(dict.fromkeys(qids))[:6]
-        for qid in qids:
-            payload = await api.get_json(sex, f"/plays/{play_id}/tables?queue={qid}")
-            teams = extract_teams(payload)
-            if teams:
-                return teams
-    except Exception:
-        pass
-
+        found, complete = await _probe_queues(sex, play_id, qids, priority, max_age_ms)
+        if found:
+            _teams_queue_memo[key] = found[0]
+            while len(_teams_queue_memo) > CACHE_MAX_ENTRIES:
+                _teams_queue_memo.popitem(last=False)
+            return found[1]
+    except Exception as e:
+        dprint("Queue discovery failed:", play_id, repr(e))
+
+    if not complete:
+        # some answer is missing: the table may well exist once upstream recovers
+        raise HTTPException(status_code=503, detail="Teams table discovery incomplete: upstream errors")
+    _teams_negative[key] = now_ms() + TEAMS_NEGATIVE_TTL_MS
     raise HTTPException(status_code=404, detail="Cannot discover teams table for this play")
 
 
 @app.get("/teams")
 async def teams(
+    request: Request,
     sex: str = Query("Male", pattern="^(Male|Female)$"),
     seasonId: str = "",
     leagueId: str = "",
@@ -592,15 +3174,281 @@ async def teams(
 ):
     if not is_uuid(playId):
         raise HTTPException(status_code=400, detail="Invalid playId")
-    return await _teams_autodiscovery(sex, playId)
+    data = await stored("teams", sex, playId, f"/plays/{playId}/tables", lambda: _teams_autodiscovery(sex, playId))
+    return validated_json(request, data, CLIENT_MAX_AGE_SHORT_S)
+
+
+def diff_teams(old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Rows added / changed (fields or table position, as `rank`) and team ids removed."""
+    old_by = {t["team_id"]: (i, t) for i, t in enumerate(old)}
+    added, changed = [], []
+    for i, t in enumerate(new):
+        prev = old_by.get(t["team_id"])
+        if prev is None:
+            added.append({**t, "rank": i + 1})
+        elif prev != (i, t):
+            changed.append({**t, "rank": i + 1})
+    new_ids = {t["team_id"] for t in new}
+    return {"added": added, "changed": changed, "removed": [tid for tid in old_by if tid not in new_ids]}
+
+
+@dataclass
+class TableTopic:
+    sex: str
+    play_id: str
+    subscribers: Set[asyncio.Queue] = field(default_factory=set)
+    teams: Optional[List[Dict[str, Any]]] = None
+    version: int = 0
+    polls: int = 0
+    task: Optional[asyncio.Task] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "playId": self.play_id,
+            "version": self.version,
+            "teams": [{**t, "rank": i + 1} for i, t in enumerate(self.teams or ())],
+        }
+
+
+class TablePoller:
+    """
+    Live league tables for subscribers: one task per subscribed (sex, play) polls
+    _teams_autodiscovery every TABLE_POLL_MS (conditional upstream GETs), diffs the
+    extract_teams rows and pushes only changes to every subscriber queue. The task
+    starts with the first subscriber and stops when the last one leaves.
+    """
+
+    def __init__(self):
+        self._topics: Dict[Tuple[str, str], TableTopic] = {}
+        self.polls = 0
+
+    def subscribe(self, sex: str, play_id: str) -> Tuple[TableTopic, asyncio.Queue]:
+        key = (sex, play_id)
+        topic = self._topics.get(key)
+        if topic is None:
+            topic = self._topics[key] = TableTopic(sex, play_id)
+        q: asyncio.Queue = asyncio.Queue(maxsize=max(1, TABLE_SUBSCRIBER_QUEUE))
+        topic.subscribers.add(q)
+        if topic.teams is not None:
+            q.put_nowait(("snapshot", json_dumps(topic.snapshot())))
+        if topic.task is None:
+            topic.task = asyncio.create_task(self._loop(topic))
+        return topic, q
+
+    def unsubscribe(self, topic: TableTopic, q: asyncio.Queue):
+        topic.subscribers.discard(q)
+        if topic.subscribers:
+            return
+        if topic.task:
+            topic.task.cancel()
+            topic.task = None
+        if self._topics.get((topic.sex, topic.play_id)) is topic:
+            del self._topics[(topic.sex, topic.play_id)]
+
+    def _publish(self, topic: TableTopic, event: str, payload: Dict[str, Any]):
+        blob = json_dumps(payload)
+        for q in topic.subscribers:
+            try:
+                q.put_nowait((event, blob))
+            except asyncio.QueueFull:
+                # slow reader: drop its backlog and resync it with the current table
+                while not q.empty():
+                    q.get_nowait()
+                q.put_nowait(("snapshot", json_dumps(topic.snapshot())))
+
+    async def _poll(self, topic: TableTopic):
+        teams = await _teams_autodiscovery(topic.sex, topic.play_id, PRIORITY_BULK, max_age_ms=0)
+        topic.polls += 1
+        self.polls += 1
+        if topic.teams is None:
+            topic.teams = teams
+            topic.version += 1
+            self._publish(topic, "snapshot", topic.snapshot())
+        else:
+            delta = diff_teams(topic.teams, teams)
+            if not any(delta.values()):
+                return
+            topic.teams = teams
+            topic.version += 1
+            self._publish(topic, "changes", {"playId": topic.play_id, "version": topic.version, **delta})
+        await store.put("teams", topic.sex, topic.play_id, teams)
+
+    async def _loop(self, topic: TableTopic):
+        wait_ms = TABLE_POLL_MS
+        while True:
+            try:
+                await self._poll(topic)
+                wait_ms = TABLE_POLL_MS
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                status = e.status_code if isinstance(e, HTTPException) else 503
+                detail = e.detail if isinstance(e, HTTPException) else str(e)
+                self._publish(topic, "error", {"playId": topic.play_id, "status": status, "error": detail})
+                wait_ms = min(wait_ms * 2, 10 * TABLE_POLL_MS)
+            await asyncio.sleep(wait_ms / 1000)
+
+    async def stop(self):
+        tasks = [t.task for t in self._topics.values() if t.task]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._topics.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tables": len(self._topics),
+            "subscribers": sum(len(t.subscribers) for t in self._topics.values()),
+            "polls": self.polls,
+        }
+
+
+table_poller = TablePoller()
+
+
+@app.get("/teams/stream")
+async def teams_stream(
+    request: Request,
+    sex: str = Query("Male", pattern="^(Male|Female)$"),
+    playId: str = "",
+    format: str = Query("sse", pattern="^(ndjson|sse)$"),
+):
+    """
+    Live table of a play: a "snapshot" event first, then "changes" events
+    ({added, changed, removed}, rows carry their `rank`) and "error" events while
+    upstream fails. All viewers of a play share one upstream poller.
+    """
+    if not is_uuid(playId):
+        raise HTTPException(status_code=400, detail="Invalid playId")
+    topic, q = table_poller.subscribe(sex, playId)
+
+    async def gen():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event, blob = await asyncio.wait_for(q.get(), TABLE_KEEPALIVE_MS / 1000)
+                except asyncio.TimeoutError:
+                    # keeps proxies from closing an idle stream
+                    yield b": keepalive\n\n" if format == "sse" else b"\n"
+                    continue
+                yield _stream_event(format, event, blob)
+        finally:
+            table_poller.unsubscribe(topic, q)
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(gen(), media_type=media_type, headers={"cache-control": "no-cache"})
+
+
+async def _team_players(sex: str, team_id: str, priority: int = PRIORITY_INTERACTIVE) -> List[Dict[str, Any]]:
+    path = f"/teams/{team_id}/players"
+
+    async def load():
+        data = await api.get_json(sex, path, priority)
+        with timed("normalize"):
+            return normalize_players(data)
+
+    return await stored("players", sex, team_id, path, load)
 
 
 @app.get("/players")
-async def players(teamId: str, sex: str = Query("Male", pattern="^(Male|Female)$")):
+async def players(request: Request, teamId: str, sex: str = Query("Male", pattern="^(Male|Female)$")):
     if not is_uuid(teamId):
         raise HTTPException(status_code=400, detail="Invalid teamId")
-    data = await api.get_json(sex, f"/teams/{teamId}/players")
-    return normalize_players(data)
+    return validated_json(request, await _team_players(sex, teamId), CLIENT_MAX_AGE_SHORT_S)
+
+
+class PlayersBatchBody(BaseModel):
+    teams: List[str]
+
+
+async def _team_players_result(sex: str, team_id: str, priority: int = PRIORITY_INTERACTIVE) -> Dict[str, Any]:
+    """One batch row: {"teamId", "players"} or {"teamId", "status", "error"}; never raises."""
+    if not is_uuid(team_id):
+        return {"teamId": team_id, "status": 400, "error": "Invalid teamId"}
+    try:
+        return {"teamId": team_id, "players": await _team_players(sex, team_id, priority)}
+    except HTTPException as e:
+        return {"teamId": team_id, "status": e.status_code, "error": e.detail}
+    except RuntimeError as e:
+        return {"teamId": team_id, "status": 503, "error": str(e)}
+
+
+@app.post("/players/batch")
+async def players_batch(body: PlayersBatchBody, sex: str = Query("Male", pattern="^(Male|Female)$")):
+    """
+    Squads of many teams in one call: {"results": [...], "failed": [teamId...]},
+    results in request order. Upstream fan-out goes through api.limiter.
+    """
+    team_ids = list(dict.fromkeys(body.teams))
+    results = await asyncio.gather(*(_team_players_result(sex, tid) for tid in team_ids))
+    return {"results": results, "failed": [r["teamId"] for r in results if "error" in r]}
+
+
+@app.get("/search")
+async def search(
+    q: str = Query(..., min_length=2),
+    sex: Optional[str] = Query(None, pattern="^(Male|Female)$"),
+    club: Optional[str] = None,
+    position: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=200),
+):
+    """
+    Fuzzy player search over every squad fetched so far (diacritics-insensitive,
+    prefix + typo tolerant), with club/position facets of the full hit set.
+    """
+    t0 = time.perf_counter()
+    out = player_index.search(q, sex=sex, club=club, position=position, limit=limit)
+    out["indexed"] = len(player_index)
+    out["ms"] = round((time.perf_counter() - t0) * 1000, 2)
+    return out
+
+
+class MatchRecord(BaseModel):
+    id: Any = None
+    firstName: Optional[str] = None
+    lastName: Optional[str] = None
+    birthDate: Optional[Union[str, int]] = None
+    club: Optional[Union[str, int]] = None
+
+
+class MatchBody(BaseModel):
+    # validated one by one in /match: a malformed record gets no matches, not a 422 for the batch
+    records: List[Any]
+    sex: Optional[str] = None
+    limit: int = 3
+    minConfidence: float = 0.5
+
+
+@app.post("/match")
+async def match_players(body: MatchBody):
+    """
+    Reconcile our player records against every LNP squad in the search index.
+    Records are compared only with players sharing a blocking key (surname word,
+    surname prefix + birth year, club + surname initial), so cost grows with
+    block sizes rather than records x players.
+    """
+    t0 = time.perf_counter()
+    results = []
+    scored = 0
+    for i, raw in enumerate(body.records):
+        try:
+            rec = MatchRecord(**raw)
+        except (TypeError, ValueError):
+            results.append({"id": raw.get("id") if isinstance(raw, dict) else None, "matches": []})
+            continue
+        q = MatchFeatures.of(rec.firstName, rec.lastName, rec.birthDate, rec.club)
+        matches, n = player_index.match(q, body.sex, max(1, min(body.limit, 20)), body.minConfidence)
+        scored += n
+        results.append({"id": rec.id, "matches": matches})
+        if i % 500 == 499:
+            await asyncio.sleep(0)  # big batches: let other requests through
+    return {
+        "results": results,
+        "matched": sum(1 for r in results if r["matches"]),
+        "candidates_scored": scored,
+        "indexed": len(player_index),
+        "ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
 
 
 @app.get("/players/{playerId}/seasons/{seasonId}/leagues/{leagueId}/stats")
@@ -616,7 +3464,149 @@ async def player_stats(
         raise HTTPException(status_code=400, detail="Invalid seasonId")
     if not is_uuid(leagueId):
         raise HTTPException(status_code=400, detail="Invalid leagueId")
-    return await api.get_json(sex, f"/players/{playerId}/seasons/{seasonId}/leagues/{leagueId}/stats")
+    # passthrough: upstream bytes go out unparsed
+    raw = await api.get_raw(sex, f"/players/{playerId}/seasons/{seasonId}/leagues/{leagueId}/stats")
+    await store.track("stats", sex, f"{playerId}:{seasonId}:{leagueId}", raw)
+    return Response(content=raw or b"null", media_type="application/json")
+
+
+# (sex, seasonId, leagueId) -> (computed at ms, league_frame)
+_league_frames: "OrderedDict[Tuple[str, str, str], Tuple[int, Dict[str, Any]]]" = OrderedDict()
+_league_frame_tasks: Dict[Tuple[str, str, str], asyncio.Task] = {}
+
+
+async def _gather_league(sex: str, season_id: str, league_id: str) -> Tuple[List[Dict[str, Any]], List[Any]]:
+    """Every squad player of the league (all plays) with the parsed stats payload, or None."""
+    plays_ = [p["id"] for p in await _league_plays(sex, season_id, league_id, PRIORITY_BULK) if is_uuid(p["id"])]
+
+    async def play_teams(pid: str) -> List[Dict[str, Any]]:
+        try:
+            return await stored(
+                "teams", sex, pid, f"/plays/{pid}/tables", lambda: _teams_autodiscovery(sex, pid, PRIORITY_BULK)
+            )
+        except HTTPException:
+            return []
+
+    teams_: Dict[str, Dict[str, Any]] = {}
+    for ts in await asyncio.gather(*(play_teams(pid) for pid in plays_)):
+        for t in ts:
+            teams_.setdefault(t["team_id"], t)
+
+    players_: Dict[str, Dict[str, Any]] = {}
+    squads = await asyncio.gather(*(_team_players_result(sex, tid, PRIORITY_BULK) for tid in teams_))
+    for tid, row in zip(teams_, squads):
+        for p in row.get("players") or ():
+            if is_uuid(p.get("player_id")):
+                players_.setdefault(p["player_id"], {**p, "team_id": tid, "team": teams_[tid]["team"]})
+
+    async def one(pid: str) -> Any:
+        path = f"/players/{pid}/seasons/{season_id}/leagues/{league_id}/stats"
+        try:
+            raw = await api.get_raw(sex, path, PRIORITY_BULK)
+        except HTTPException:
+            return None
+        await store.track("stats", sex, f"{pid}:{season_id}:{league_id}", raw)
+        return json_loads(raw)
+
+    return list(players_.values()), await asyncio.gather(*(one(pid) for pid in players_))
+
+
+async def _league_frame(sex: str, season_id: str, league_id: str, refresh: bool = False) -> Tuple[int, Dict[str, Any]]:
+    """Cached league_frame of a (season, league); concurrent misses share one computation."""
+    key = (sex, season_id, league_id)
+    hit = _league_frames.get(key)
+    if hit and not refresh and now_ms() - hit[0] <= LEAGUE_STATS_TTL_MS:
+        _league_frames.move_to_end(key)
+        return hit
+
+    async def build() -> Tuple[int, Dict[str, Any]]:
+        players_, payloads = await _gather_league(sex, season_id, league_id)
+        with timed("compute"):
+            t0 = time.perf_counter()
+            keep = [i for i, d in enumerate(payloads) if d is not None]
+            frame = league_frame(
+                [players_[i] for i in keep], [flatten_stats(payloads[i]) for i in keep], LEAGUE_STATS_MIN_MINUTES
+            )
+            frame["index"] = {p["player_id"]: i for i, p in enumerate(frame["players"])}
+            frame["missing"] = len(players_) - len(keep)
+            frame["compute_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        out = (now_ms(), frame)
+        _league_frames[key] = out
+        while len(_league_frames) > LEAGUE_STATS_MAX_ENTRIES:
+            _league_frames.popitem(last=False)
+        return out
+
+    task = _league_frame_tasks.get(key)
+    if task is None:
+        task = _league_frame_tasks[key] = asyncio.create_task(build())
+        task.add_done_callback(lambda _: _league_frame_tasks.pop(key, None))
+    return await asyncio.shield(task)
+
+
+@app.get("/league-stats")
+async def league_stats(
+    sex: str = Query("Male", pattern="^(Male|Female)$"),
+    seasonId: str = "",
+    leagueId: str = "",
+    playerId: Optional[str] = None,
+    refresh: bool = False,
+):
+    """
+    Whole-league comparison in one call: every squad player's stats flattened into
+    a players x metrics matrix, with per-90 rates for counting stats (players with
+    at least LEAGUE_STATS_MIN_MINUTES), league percentiles and z-scores within
+    position groups (GK/DF/MF/FW). Computed once per (season, league) and cached
+    for LEAGUE_STATS_TTL_MS. `playerId` returns only that player's row.
+    """
+    if np is None:
+        raise HTTPException(status_code=503, detail="numpy is not installed; /league-stats needs it")
+    if not is_uuid(seasonId):
+        raise HTTPException(status_code=400, detail="Invalid seasonId")
+    if not is_uuid(leagueId):
+        raise HTTPException(status_code=400, detail="Invalid leagueId")
+    if playerId is not None and not is_uuid(playerId):
+        raise HTTPException(status_code=400, detail="Invalid playerId")
+
+    computed_at, frame = await _league_frame(sex, seasonId, leagueId, refresh)
+    only = None
+    if playerId is not None:
+        if playerId not in frame["index"]:
+            raise HTTPException(status_code=404, detail="Player has no stats in this league")
+        only = {frame["index"][playerId]}
+    with timed("normalize"):
+        rows = league_frame_rows(frame, only)
+    return FastJSONResponse(
+        {
+            "seasonId": seasonId,
+            "leagueId": leagueId,
+            "players": len(frame["players"]),
+            "missing": frame["missing"],
+            "columns": frame["columns"],
+            "per90": [c for c, counting in zip(frame["columns"], frame["counting"].tolist()) if counting],
+            "min_minutes": LEAGUE_STATS_MIN_MINUTES,
+            "computed_at_ms": computed_at,
+            "compute_ms": frame["compute_ms"],
+            "rows": rows,
+        }
+    )
+
+
+@app.get("/changes")
+async def changes(
+    since: int = 0,
+    kinds: str = "teams,players,stats",
+    limit: int = Query(1000, ge=1, le=10000),
+):
+    """
+    Resources whose normalized form changed, oldest first. `since` is the cursor
+    (`seq`) of the last change already consumed; pass back `next_since`.
+    Keys: teams -> playId, players -> teamId, stats -> playerId:seasonId:leagueId.
+    """
+    if not store.enabled:
+        raise HTTPException(status_code=503, detail="Change tracking needs LNP_STORE_PATH")
+    kind_list = [k.strip() for k in kinds.split(",") if k.strip()]
+    rows = await store.changes(since, kind_list, limit)
+    return {"changes": rows, "next_since": rows[-1]["seq"] if rows else since}
 
 
 class StatsBatchBody(BaseModel):
@@ -625,26 +3615,402 @@ class StatsBatchBody(BaseModel):
     players: List[str]
 
 
-@app.post("/player-stats/batch")
-async def player_stats_batch(body: StatsBatchBody, sex: str = Query("Male", pattern="^(Male|Female)$")):
+def _validate_stats_batch(body: StatsBatchBody) -> List[str]:
     if not is_uuid(body.seasonId):
         raise HTTPException(status_code=400, detail="Invalid seasonId")
     if not is_uuid(body.leagueId):
         raise HTTPException(status_code=400, detail="Invalid leagueId")
+    return [p for p in body.players if is_uuid(p)]
+
 
-    pids = [p for p in body.players if is_uuid(p)]
+@app.post("/player-stats/batch")
+async def player_stats_batch(body: StatsBatchBody, sex: str = Query("Male", pattern="^(Male|Female)$")):
+    pids = _validate_stats_batch(body)
     if not pids:
         return {}
 
-    sem = asyncio.Semaphore(int(os.getenv("STATS_CONCURRENCY", "6")))
+    # concurrency is governed by api.limiter (shared across batches)
+    async def one(pid: str) -> Tuple[str, bytes]:
+        try:
+            raw = await api.get_raw(
+                sex, f"/players/{pid}/seasons/{body.seasonId}/leagues/{body.leagueId}/stats", PRIORITY_BULK
+            )
+            await store.track("stats", sex, f"{pid}:{body.seasonId}:{body.leagueId}", raw)
+            return pid, raw
+        except Exception:
+            return pid, b""
+
+    pairs = await asyncio.gather(*(one(pid) for pid in pids))
+    # {pid: {"leagueId": ..., "stats": <upstream bytes>}} assembled without re-parsing stats
+    meta = {"leagueId": body.leagueId}
+    blob = b"{" + b",".join(json_dumps(pid) + b":" + splice_raw(meta, "stats", raw) for pid, raw in pairs) + b"}"
+    return Response(content=blob, media_type="application/json")
+
 
-    async def one(pid: str):
+def _stream_event(fmt: str, event: str, blob: bytes) -> bytes:
+    if fmt == "sse":
+        return b"event: " + event.encode() + b"\ndata: " + blob + b"\n\n"
+    return blob + b"\n"
+
+
+@app.post("/player-stats/batch/stream")
+async def player_stats_batch_stream(
+    body: StatsBatchBody,
+    sex: str = Query("Male", pattern="^(Male|Female)$"),
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+):
+    """
+    Same as /player-stats/batch, but emits one line/event per player as soon as
+    its stats arrive, then a summary. Pending upstream calls are cancelled when
+    the client disconnects.
+    """
+    pids = _validate_stats_batch(body)
+    started = now_ms()
+
+    async def one(pid: str) -> Tuple[Dict[str, Any], bytes]:
+        t0 = now_ms()
+        try:
+            raw = await api.get_raw(
+                sex, f"/players/{pid}/seasons/{body.seasonId}/leagues/{body.leagueId}/stats", PRIORITY_BULK
+            )
+            await store.track("stats", sex, f"{pid}:{body.seasonId}:{body.leagueId}", raw)
+            return {"playerId": pid, "leagueId": body.leagueId, "ms": now_ms() - t0}, raw
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            return {"playerId": pid, "leagueId": body.leagueId, "ms": now_ms() - t0, "error": detail}, b""
+
+    async def gen():
+        tasks = [asyncio.create_task(one(pid)) for pid in pids]
+        failed: List[str] = []
+        timings: Dict[str, int] = {}
+        try:
+            for fut in asyncio.as_completed(tasks):
+                row, raw = await fut
+                timings[row["playerId"]] = row["ms"]
+                if "error" in row:
+                    failed.append(row["playerId"])
+                yield _stream_event(format, "player", splice_raw(row, "stats", raw))
+            yield _stream_event(
+                format,
+                "summary",
+                json_dumps(
+                    {
+                        "total": len(pids),
+                        "ok": len(pids) - len(failed),
+                        "failed": failed,
+                        "total_ms": now_ms() - started,
+                        "timings": timings,
+                    }
+                ),
+            )
+        finally:
+            # client went away (or we are done): drop whatever is still pending
+            for t in tasks:
+                t.cancel()
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(gen(), media_type=media_type, headers={"cache-control": "no-cache"})
+
+
+@app.post("/players/batch/stream")
+async def players_batch_stream(
+    body: PlayersBatchBody,
+    sex: str = Query("Male", pattern="^(Male|Female)$"),
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+):
+    """Same as /players/batch, one line/event per team as it completes, then a summary."""
+    team_ids = list(dict.fromkeys(body.teams))
+    started = now_ms()
+
+    async def gen():
+        tasks = [asyncio.create_task(_team_players_result(sex, tid)) for tid in team_ids]
+        failed: List[str] = []
+        try:
+            for fut in asyncio.as_completed(tasks):
+                row = await fut
+                if "error" in row:
+                    failed.append(row["teamId"])
+                yield _stream_event(format, "team", json_dumps(row))
+            summary = {
+                "total": len(team_ids),
+                "ok": len(team_ids) - len(failed),
+                "failed": failed,
+                "total_ms": now_ms() - started,
+            }
+            yield _stream_event(format, "summary", json_dumps(summary))
+        finally:
+            for t in tasks:
+                t.cancel()
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(gen(), media_type=media_type, headers={"cache-control": "no-cache"})
+
+
+# ---------- Bulk export ----------
+class ExportBody(BaseModel):
+    seasonId: str
+    leagueId: str
+    playIds: List[str] = []
+    includeStats: bool = True
+
+
+@dataclass
+class ExportJob:
+    """
+    Walks plays -> teams -> players (-> stats) of one league into data.jsonl.
+    Each finished team is appended to checkpoint.tsv with the data file offset,
+    so a restarted job truncates any half-written team and skips completed ones.
+    """
+    id: str
+    sex: str
+    params: Dict[str, Any]
+    status: str = "pending"
+    plays_total: int = 0
+    teams_total: int = 0
+    teams_done: int = 0
+    teams_resumed: int = 0
+    players_written: int = 0
+    upstream_calls: int = 0
+    errors: List[str] = field(default_factory=list)
+    started_at_ms: int = 0
+    finished_at_ms: int = 0
+
+    @property
+    def dir(self) -> str:
+        return os.path.join(EXPORT_DIR, self.id)
+
+    @property
+    def data_path(self) -> str:
+        return os.path.join(self.dir, "data.jsonl")
+
+    @property
+    def checkpoint_path(self) -> str:
+        return os.path.join(self.dir, "checkpoint.tsv")
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "sex": self.sex,
+            "params": self.params,
+            "status": self.status,
+            "plays_total": self.plays_total,
+            "teams_total": self.teams_total,
+            "teams_done": self.teams_done,
+            "teams_resumed": self.teams_resumed,
+            "players_written": self.players_written,
+            "upstream_calls": self.upstream_calls,
+            "errors": self.errors[-50:],
+            "started_at_ms": self.started_at_ms or None,
+            "finished_at_ms": self.finished_at_ms or None,
+        }
+
+    def save(self):
+        os.makedirs(self.dir, exist_ok=True)
+        tmp = os.path.join(self.dir, "job.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, ensure_ascii=False)
+        os.replace(tmp, os.path.join(self.dir, "job.json"))
+
+
+_export_jobs: Dict[str, ExportJob] = {}
+
+
+def _export_job_id(sex: str, body: ExportBody) -> str:
+    key = json.dumps([sex, body.seasonId, body.leagueId, sorted(body.playIds), body.includeStats])
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def _load_checkpoint(job: ExportJob) -> Set[str]:
+    """
+    Completed team ids; truncates data.jsonl to the last committed offset.
+    Only whole lines count, and only while offsets never decrease and stay within
+    data.jsonl: a line cut off mid-write (and anything after it) is dropped, and
+    checkpoint.tsv is truncated with it so later appends start on a clean line.
+    """
+    done: Set[str] = set()
+    offset = 0
+    good = 0  # checkpoint.tsv bytes up to the last accepted line
+    data_size = os.path.getsize(job.data_path) if os.path.exists(job.data_path) else 0
+    if os.path.exists(job.checkpoint_path):
+        with open(job.checkpoint_path, "rb") as f:
+            for line in f:
+                parts = line.decode("utf-8", "replace").split("\t")
+                if not line.endswith(b"\n") or len(parts) != 2 or not parts[1].strip().isdigit():
+                    break
+                end = int(parts[1])
+                if end < offset or end > data_size:
+                    break
+                done.add(parts[0])
+                offset = end
+                good += len(line)
+        if good < os.path.getsize(job.checkpoint_path):
+            dprint("Export", job.id, "checkpoint: dropping a partial or inconsistent tail")
+            with open(job.checkpoint_path, "r+b") as f:
+                f.truncate(good)
+    if os.path.exists(job.data_path):
+        with open(job.data_path, "r+b") as f:
+            f.truncate(offset)
+    return done
+
+
+async def _run_export(job: ExportJob, body: ExportBody):
+    sem = asyncio.Semaphore(max(1, EXPORT_CONCURRENCY))
+    bucket = TokenBucket(EXPORT_RATE_PER_S)
+    write_mu = asyncio.Lock()
+    sex = job.sex
+
+    async def fetch(path: str) -> Any:
         async with sem:
+            await bucket.take()
+            job.upstream_calls += 1
+            return await api.get_json(sex, path, PRIORITY_BULK)
+
+    async def export_team(play_id: str, team: Dict[str, Any], out, ckpt):
+        tid = team["team_id"]
+        squad = normalize_players(await fetch(f"/teams/{tid}/players"))
+        player_index.add_team(sex, tid, squad)
+        lines = [{"type": "team", "play_id": play_id, **team}]
+
+        async def with_stats(p: Dict[str, Any]) -> Dict[str, Any]:
+            row = {"type": "player", "team_id": tid, "play_id": play_id, **p}
+            if body.includeStats and is_uuid(p.get("player_id")):
+                try:
+                    row["stats"] = await fetch(
+                        f"/players/{p['player_id']}/seasons/{body.seasonId}/leagues/{body.leagueId}/stats"
+                    )
+                except Exception as e:
+                    row["stats"] = None
+                    row["stats_error"] = str(getattr(e, "detail", e))
+            return row
+
+        lines += await asyncio.gather(*(with_stats(p) for p in squad))
+        blob = "".join(json.dumps(x, ensure_ascii=False, separators=(",", ":")) + "\n" for x in lines)
+
+        async with write_mu:
+            out.write(blob.encode("utf-8"))
+            out.flush()
+            ckpt.write(f"{tid}\t{out.tell()}\n")
+            ckpt.flush()
+            job.teams_done += 1
+            job.players_written += len(squad)
+            job.save()
+
+    job.status = "running"
+    job.started_at_ms = now_ms()
+    job.save()
+    done = _load_checkpoint(job)
+    job.teams_resumed = len(done)
+    job.teams_done = len(done)
+
+    try:
+        if body.playIds:
+            play_ids = body.playIds
+        else:
+            plays_ = normalize_play_dictionaries(
+                await fetch(f"/leagues/{body.leagueId}/seasons/{body.seasonId}/play-dictionaries")
+            )
+            play_ids = [p["id"] for p in plays_ if is_uuid(p["id"])]
+        job.plays_total = len(play_ids)
+
+        work: List[Tuple[str, Dict[str, Any]]] = []
+        seen: Set[str] = set()
+        for pid in play_ids:
             try:
-                stats = await api.get_json(sex, f"/players/{pid}/seasons/{body.seasonId}/leagues/{body.leagueId}/stats")
-                return pid, {"stats": stats, "leagueId": body.leagueId}
-            except Exception:
-                return pid, {"stats": None, "leagueId": body.leagueId}
+                for t in await _teams_autodiscovery(sex, pid, PRIORITY_BULK):
+                    if t["team_id"] not in seen:
+                        seen.add(t["team_id"])
+                        work.append((pid, t))
+            except HTTPException as e:
+                job.errors.append(f"play {pid}: {e.detail}")
+        job.teams_total = len(work)
+        job.save()
+
+        with open(job.data_path, "ab") as out, open(job.checkpoint_path, "a", encoding="utf-8") as ckpt:
+
+            async def guarded(pid: str, t: Dict[str, Any]):
+                try:
+                    await export_team(pid, t, out, ckpt)
+                except HTTPException as e:
+                    job.errors.append(f"team {t['team_id']}: {e.detail}")
+
+            await asyncio.gather(*(guarded(pid, t) for pid, t in work if t["team_id"] not in done))
+
+        job.status = "done"
+    except asyncio.CancelledError:
+        job.status = "cancelled"
+        raise
+    except Exception as e:
+        job.status = "failed"
+        job.errors.append(repr(e))
+    finally:
+        job.finished_at_ms = now_ms()
+        job.save()
+
+
+def _get_export_job(job_id: str) -> ExportJob:
+    job = _export_jobs.get(job_id)
+    if job:
+        return job
+    # job from a previous process: report its last saved snapshot
+    path = os.path.join(EXPORT_DIR, os.path.basename(job_id), "job.json")
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Unknown export job")
+    with open(path, encoding="utf-8") as f:
+        d = json.load(f)
+    job = ExportJob(id=d["id"], sex=d["sex"], params=d["params"])
+    for k in ("plays_total", "teams_total", "teams_done", "teams_resumed", "players_written", "upstream_calls", "errors"):
+        setattr(job, k, d.get(k) or getattr(job, k))
+    job.status = "interrupted" if d.get("status") in ("pending", "running") else d.get("status", "")
+    return job
+
+
+@app.post("/export/jobs")
+async def export_start(body: ExportBody, sex: str = Query("Male", pattern="^(Male|Female)$")):
+    """
+    Start (or resume, for identical parameters) a whole-league export.
+    """
+    if not is_uuid(body.seasonId):
+        raise HTTPException(status_code=400, detail="Invalid seasonId")
+    if not is_uuid(body.leagueId):
+        raise HTTPException(status_code=400, detail="Invalid leagueId")
+    if any(not is_uuid(p) for p in body.playIds):
+        raise HTTPException(status_code=400, detail="Invalid playIds")
 
-    pairs = await asyncio.gather(*(one(pid) for pid in pids))
-    return {k: v for (k, v) in pairs}
+    job_id = _export_job_id(sex, body)
+    job = _export_jobs.get(job_id)
+    if job and job.status in ("pending", "running"):
+        return job.as_dict()
+
+    job = ExportJob(id=job_id, sex=sex, params=body.model_dump())
+    _export_jobs[job_id] = job
+    job.save()
+    spawn_bg(_run_export(job, body))
+    return job.as_dict()
+
+
+@app.get("/export/jobs/{jobId}")
+async def export_progress(jobId: str):
+    return _get_export_job(jobId).as_dict()
+
+
+@app.get("/export/jobs/{jobId}/data")
+async def export_data(jobId: str):
+    job = _get_export_job(jobId)
+    if not os.path.exists(job.data_path):
+        raise HTTPException(status_code=404, detail="No data yet")
+    return FileResponse(job.data_path, media_type="application/x-ndjson", filename=f"lnp-export-{job.id}.jsonl")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="LNP scraper service tools")
+    ap.add_argument("command", choices=["broker"], help="broker: own Playwright and serve tokens to API workers")
+    ap.add_argument("--addr", default=LNP_BROKER_ADDR, help="Unix socket path or host:port")
+    args = ap.parse_args()
+    if LNP_TOKEN_SOURCE == "broker":
+        raise SystemExit("The broker needs a real token source (LNP_TOKEN_SOURCE=playwright or static)")
+    try:
+        asyncio.run(run_token_broker(tp, refresher, args.addr))
+    except KeyboardInterrupt:
+        pass
@@ -3,6 +3,16 @@ import { NextRequest, NextResponse } from "next/server";
 const BASE =
   process.env.LNP_SERVICE_URL?.replace(/\/$/, "") || "http://127.0.0.1:8765";
 
+// response headers passed back to the browser (validators, caching hints, diagnostics)
+const FORWARD_HEADERS = [
+  "content-type",
+  "etag",
+  "last-modified",
+  "cache-control",
+  "retry-after",
+  "server-timing",
+];
+
 async function proxy(req: NextRequest, pathParts: string[]) {
   const url = new URL(req.url);
   const target = new URL(`${BASE}/${pathParts.join("/")}`);
@@ -25,20 +35,30 @@ async function proxy(req: NextRequest, pathParts: string[]) {
         ? undefined
         : await req.arrayBuffer(),
     redirect: "manual",
+    // no Next data cache: the browser revalidates end to end with If-None-Match (forwarded above)
     cache: "no-store",
+    // client gone -> stop the upstream request (and any stream)
+    signal: req.signal,
   };
 
   try {
     const res = await fetch(target, init);
 
-    // Copy status + content-type
+    // Copy status + selected headers; content-encoding/length are not forwarded
+    // because fetch has already decoded the body
     const outHeaders = new Headers();
-    const ct = res.headers.get("content-type");
-    if (ct) outHeaders.set("content-type", ct);
+    for (const name of FORWARD_HEADERS) {
+      const v = res.headers.get(name);
+      if (v) outHeaders.set(name, v);
+    }
+    if (outHeaders.get("content-type")?.startsWith("text/event-stream")) {
+      outHeaders.set("x-accel-buffering", "no");
+    }
 
-    const buf = await res.arrayBuffer();
+    // stream the body through instead of buffering it (304 has none)
+    const body = res.status === 304 || method === "HEAD" ? null : res.body;
 
-    return new NextResponse(buf, {
+    return new NextResponse(body, {
       status: res.status,
       headers: outHeaders,
     });
@@ -66,7 +66,8 @@ const dedupeKey = (p: Pick<GlobalPlayer, "name" | "club" | "extId">) =>
   [p.name?.trim().toLowerCase() || "", p.club?.trim().toLowerCase() || ""].join("::");
 
 async function fetchJson<T>(url: string, signal?: AbortSignal): Promise<T> {
-  const r = await fetch(url, { signal, cache: "no-store" });
+  // "no-cache": reuse the browser's copy after an If-None-Match round trip (304), never serve it unchecked
+  const r = await fetch(url, { signal, cache: "no-cache" });
   if (!r.ok) {
     let txt = await r.text().catch(() => "");
     try { const j = JSON.parse(txt); if (j?.detail) txt = String(j.detail); } catch { }